@@ -82,25 +82,29 @@ class Detector:
         self._dc_dom_bg_mu = mu
         self._dc_dom_bg_sig = sig
 
-    def i3_dom_bg(self, dt=0.5*u.s, size=1):
-        return np.random.normal(loc=self.i3_dom_bg_mu * dt.to(u.s).value,
-                                scale=self.i3_dom_bg_sig * np.sqrt(dt.to(u.s).value),
-                                size=size)
-
-    def dc_dom_bg(self, dt=0.5*u.s, size=1):
-        return np.random.normal(loc=self.dc_dom_bg_mu * dt.to(u.s).value,
-                                scale=self.dc_dom_bg_sig * np.sqrt(dt.to(u.s).value),
-                                size=size)
-
-    def i3_bg(self, dt=0.5*u.s, size=1):
-        return np.random.normal(loc=self.i3_dom_bg_mu * dt.to(u.s).value * self.n_i3_doms,
-                                scale=self.i3_dom_bg_sig * np.sqrt(dt.to(u.s).value * self.n_i3_doms),
-                                size=size)
-
-    def dc_bg(self, dt=0.5*u.s, size=1):
-        return np.random.normal(loc=self.dc_dom_bg_mu * dt.to(u.s).value * self.n_dc_doms,
-                                scale=self.dc_dom_bg_sig * np.sqrt(dt.to(u.s).value * self.n_dc_doms),
-                                size=size)
+    def i3_dom_bg(self, dt=0.5*u.s, size=1, *, rng=None):
+        rng = np.random if rng is None else rng
+        return rng.normal(loc=self.i3_dom_bg_mu * dt.to(u.s).value,
+                          scale=self.i3_dom_bg_sig * np.sqrt(dt.to(u.s).value),
+                          size=size)
+
+    def dc_dom_bg(self, dt=0.5*u.s, size=1, *, rng=None):
+        rng = np.random if rng is None else rng
+        return rng.normal(loc=self.dc_dom_bg_mu * dt.to(u.s).value,
+                          scale=self.dc_dom_bg_sig * np.sqrt(dt.to(u.s).value),
+                          size=size)
+
+    def i3_bg(self, dt=0.5*u.s, size=1, *, rng=None):
+        rng = np.random if rng is None else rng
+        return rng.normal(loc=self.i3_dom_bg_mu * dt.to(u.s).value * self.n_i3_doms,
+                          scale=self.i3_dom_bg_sig * np.sqrt(dt.to(u.s).value * self.n_i3_doms),
+                          size=size)
+
+    def dc_bg(self, dt=0.5*u.s, size=1, *, rng=None):
+        rng = np.random if rng is None else rng
+        return rng.normal(loc=self.dc_dom_bg_mu * dt.to(u.s).value * self.n_dc_doms,
+                          scale=self.dc_dom_bg_sig * np.sqrt(dt.to(u.s).value * self.n_dc_doms),
+                          size=size)
     @property
     def i3_total_effvol(self):
         return self._i3_effvol
@@ -1,6 +1,7 @@
 
 from . import config, source, detector, IO
 from .interactions import Interactions
+from .photonspectra import get_photon_spectra
 from snewpy.neutrino import Flavor
 from .neutrino import Ordering
 from .oscillation import SimpleMixing
@@ -237,17 +238,9 @@ class SimulationHandler:
         :return: None
         :rtype: None
         """
-        photon_spectra = np.zeros(shape=(len(self.flavors), self.energy.size))
-
-        for nu, flavor in enumerate(self.flavors):
-            for interaction in Interactions:
-                xs = interaction.cross_section(flavor, self.energy).to(u.m ** 2).value
-                E_lep = interaction.mean_lepton_energy(flavor, self.energy).value
-                photon_scaling_factor = interaction.photon_scaling_factor(flavor).value
-                photon_spectra[nu] += xs * E_lep * photon_scaling_factor
-
-        photon_spectra *= u.m ** 2
-        self._photon_spectra = photon_spectra
+        photon_spectra = get_photon_spectra(Interactions, self.flavors, self.energy)
+        self._photon_spectra = np.array([photon_spectra[flavor].to(u.m ** 2).value
+                                         for flavor in self.flavors]) * u.m ** 2
 
     def compute_energy_per_volume(self):
         """Computes the photonic energy per volume in the IceCube Detector for each flavor of neutrino
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""Detection horizons of supernova models.
+
+The detection horizon of a model is the progenitor distance at which the SNDAQ trigger significance exceeds a
+threshold with a given probability. Horizons are first estimated from the expected significance of the model (see
+Simulation.expected_significance), then measured with MC trials near that estimate. Each trial is drawn once and
+rescaled in distance, so that the distance at which it crosses the threshold is bisected without drawing new
+trials, and the horizon is a quantile of these distances.
+"""
+
+from __future__ import print_function, division
+
+from astropy import units as u
+from concurrent.futures import ProcessPoolExecutor
+from scipy.stats import binom, norm
+
+import numpy as np
+
+from .simulation import _trial_horizons
+
+MAX_WIDENINGS = 8  # Maximum number of times the bracket of the trials is widened, see detection_horizon
+
+
+def detection_horizon(simulations, threshold=6., probability=0.5, dt=0.5*u.s, binnings=None, *, confidence=0.9,
+                      rtol=0.02, min_trials=1000, max_trials=100000, seed=None, workers=None, executor=None,
+                      chunk_size=1000):
+    """Computes the distances at which models are detected with a given probability
+
+    Parameters
+    ----------
+    simulations : asteria.simulation.Simulation or list of asteria.simulation.Simulation
+        Simulations of the models, which must have been run
+    threshold : float, optional
+        Threshold on the highest SNDAQ trigger significance across `binnings`
+    probability : float or np.ndarray, optional
+        Detection probabilities, a horizon is computed for each
+    dt : astropy.units.Quantity
+        Size of smallest binning of neutrino lightcurve used in simulation.
+    binnings : astropy.units.Quantity or None, default = [0.5, 1.5, 4., 10.] * astropy.units.s
+        Size of time binnings at which to calculate trigger test statistic
+    confidence : float, optional
+        Confidence level of the intervals of the horizons
+    rtol : float, optional
+        Target relative width of the confidence intervals. The number of trials is doubled, starting from
+        `min_trials`, until the intervals of all probabilities are narrower or `max_trials` is reached.
+    min_trials, max_trials : int, optional
+        Minimum and maximum number of MC trials per model
+    seed : int, numpy.random.SeedSequence or None, optional
+        Seed of the root seed sequence of the trials, see Simulation.sample_significance. The trials of all models
+        are drawn from the same streams.
+    workers : int or None, optional
+        Number of worker processes used to simulate the trials in parallel.
+    executor : concurrent.futures.Executor or None, optional
+        Executor used to simulate the trials, takes precedence over `workers`.
+    chunk_size : int, optional
+        Number of trials simulated together
+
+    Returns
+    -------
+    horizon : astropy.units.Quantity
+        Detection horizons with shape (len(simulations), probability.size), or probability.shape for a single
+        simulation
+    lower, upper : astropy.units.Quantity
+        Bounds of the confidence intervals of the horizons, with the shape of `horizon`
+
+    Notes
+    -----
+    For each model, the detection probability at each distance is estimated from the mean and standard deviation
+    of the expected significance (as a Gaussian), and the MC trials are bisected in a bracket around the distances
+    at which it equals `probability`. Trials use random signal offsets, as in Simulation.sample_significance with
+    the same `seed`: for a horizon D at probability p, the fraction of those trials with a significance above
+    `threshold` at distance D is p. The confidence interval is the distribution-free interval of a quantile, from
+    the order statistics of the trial distances. The bracket is widened if a horizon falls outside of it, and a
+    RuntimeError is raised if it is still outside after `MAX_WIDENINGS` widenings, e.g. for a threshold that is not
+    reached at any distance because of the DOM deadtime.
+    """
+    single = not isinstance(simulations, (list, tuple))
+    simulations = [simulations] if single else simulations
+    probability = np.asarray(probability, dtype=float)
+
+    if executor is None and workers is not None and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return detection_horizon(simulations[0] if single else simulations, threshold, probability, dt,
+                                     binnings, confidence=confidence, rtol=rtol, min_trials=min_trials,
+                                     max_trials=max_trials, seed=seed, executor=executor, chunk_size=chunk_size)
+
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    binnings = [0.5, 1.5, 4, 10] * u.s if binnings is None else binnings
+    _dt = dt.to(u.s).value
+    rebin_factors = [int(binsize / _dt) for binsize in binnings.to(u.s).value]
+
+    results = np.zeros((len(simulations), 3, probability.size))
+    for sim, result in zip(simulations, results):
+        guess = _expected_horizon(sim, threshold, probability.ravel(), dt, binnings)
+        bracket = (guess.min() / 2, guess.max() * 2)
+        view = sim.result()
+        horizons = np.zeros(0)
+        n_trials = min_trials
+        n_widenings = 0
+        while True:
+            args = [(view, _dt, rebin_factors, threshold, seed_sequence, start,
+                     min(start + chunk_size, n_trials), bracket, rtol / 10)
+                    for start in range(horizons.size, n_trials, chunk_size)]
+            if executor is not None:
+                batches = list(executor.map(_trial_horizons, *zip(*args)))
+            else:
+                batches = [_trial_horizons(*_args) for _args in args]
+            horizons = np.concatenate([horizons, *batches])
+
+            result[:] = _quantile_interval(horizons, 1 - probability.ravel(), confidence)
+            if not np.isfinite(result).all() or (result == 0).any():
+                # A horizon or its interval is outside of the bracket, trials are bisected again in a wider one
+                if n_widenings == MAX_WIDENINGS:
+                    raise RuntimeError(f"Detection horizons are outside of [{bracket[0]:.3g}, {bracket[1]:.3g}] kpc, "
+                                       f"threshold {threshold} is not reached (or always exceeded) with "
+                                       f"probability {probability}")
+                n_widenings += 1
+                bracket = (bracket[0] / 4, bracket[1] * 4)
+                horizons = np.zeros(0)
+                continue
+            if n_trials >= max_trials or ((result[2] - result[1]) / result[0]).max() <= rtol:
+                break
+            n_trials = min(2 * n_trials, max_trials)
+
+    horizon, lower, upper = (results[:, idx].reshape((len(simulations),) + probability.shape) * u.kpc
+                             for idx in range(3))
+    if single:
+        return horizon[0], lower[0], upper[0]
+    return horizon, lower, upper
+
+
+def _expected_horizon(sim, threshold, probability, dt, binnings):
+    """Returns the distances in kpc at which the detection probability is `probability`, estimated from the
+    expected significance of a simulation"""
+    distances = np.geomspace(1e-2, 1e4, 1201)
+    xi_mean, xi_std = sim.expected_significance(distances * u.kpc, dt, binnings=binnings)
+    # Detection probability decreases with distance
+    p_detect = norm.sf(threshold, loc=xi_mean, scale=xi_std)
+    return np.exp(np.interp(-probability, -p_detect, np.log(distances)))
+
+
+def _quantile_interval(values, q, confidence):
+    """Returns the q-quantiles of `values` and the bounds of their distribution-free confidence intervals"""
+    values = np.sort(values)
+    alpha = 1 - confidence
+    lower = np.clip(binom.ppf(alpha / 2, values.size, q).astype(int) - 1, 0, values.size - 1)
+    upper = np.clip(binom.ppf(1 - alpha / 2, values.size, q).astype(int), 0, values.size - 1)
+    return np.quantile(values, q), values[lower], values[upper]
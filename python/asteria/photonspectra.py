@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Photon spectra of neutrino interactions in ice.
+
+The spectrum of photons produced by the interactions of one neutrino flavor depends only on the set of interactions,
+the flavor and the neutrino energies. Spectra are memoized for the lifetime of the process, so simulations sharing
+an energy grid (e.g. a sweep over models) compute them once, and may be persisted to disk to be shared between
+processes.
+"""
+
+from __future__ import print_function, division
+
+from astropy import units as u
+from collections import OrderedDict
+
+import numpy as np
+import hashlib
+import os
+import threading
+
+from .util import atomic_path
+
+MEMO_SIZE = 64  # Maximum number of (interactions, flavors, energy grid) entries held in memory
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def compute_photon_spectra(interactions, flavors, E):
+    """Computes the spectrum of photons produced by neutrino interactions in the IceCube Detector
+
+    Parameters
+    ----------
+    interactions : iterable of asteria.interactions.Interactions
+        Neutrino interactions
+    flavors : iterable of snewpy.neutrino.Flavor
+        Neutrino flavors
+    E : astropy.units.Quantity
+        Neutrino energies
+
+    Returns
+    -------
+    photon_spectra : dict
+        Flavor-keyed dictionary of photon spectra evaluated at `E`, in units m**2
+    """
+    photon_spectra = {}
+    for flavor in flavors:
+        result = np.zeros(E.size)
+        for interaction in interactions:
+            xs = interaction.cross_section(flavor, E).to(u.m ** 2).value
+            E_lep = interaction.mean_lepton_energy(flavor, E).value
+            photon_scaling_factor = interaction.photon_scaling_factor(flavor).value
+            result += xs * E_lep * photon_scaling_factor
+        photon_spectra.update({flavor: result * (u.m * u.m)})
+    return photon_spectra
+
+
+def get_photon_spectra(interactions, flavors, E, *, cache_dir=None):
+    """Returns the photon spectra of neutrino interactions, see compute_photon_spectra
+
+    Spectra are memoized in this process, holding the `MEMO_SIZE` most recently used entries. The returned spectra
+    are shared between callers and are read-only.
+
+    Parameters
+    ----------
+    interactions : iterable of asteria.interactions.Interactions
+        Neutrino interactions
+    flavors : iterable of snewpy.neutrino.Flavor
+        Neutrino flavors
+    E : astropy.units.Quantity
+        Neutrino energies
+    cache_dir : str or None, optional
+        Directory used to persist spectra on disk, if None (default) spectra are only memoized in this process.
+        Use `asteria.util.cache_path` for the default ASTERIA cache directory.
+
+    Returns
+    -------
+    photon_spectra : dict
+        Flavor-keyed dictionary of photon spectra evaluated at `E`, in units m**2
+    """
+    interactions = list(interactions)
+    flavors = list(flavors)
+    _E = E.to(u.MeV).value
+    key = _spectra_key(interactions, flavors, _E)
+
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return dict(_memo[key])
+
+    path = None if cache_dir is None else os.path.join(cache_dir, 'photonspectra', key + '.npz')
+    if path is not None and os.path.isfile(path):
+        with np.load(path) as data:
+            spectra = {flavor: data[flavor.name] for flavor in flavors}
+    else:
+        spectra = {flavor: spectrum.value
+                   for flavor, spectrum in compute_photon_spectra(interactions, flavors, _E * u.MeV).items()}
+        if path is not None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with atomic_path(path) as tmp_path, open(tmp_path, 'wb') as f:
+                np.savez(f, **{flavor.name: spectrum for flavor, spectrum in spectra.items()})
+
+    for spectrum in spectra.values():
+        spectrum.flags.writeable = False
+    photon_spectra = {flavor: spectrum << (u.m * u.m) for flavor, spectrum in spectra.items()}
+
+    with _memo_lock:
+        _memo[key] = photon_spectra
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return dict(photon_spectra)
+
+
+def clear_memo():
+    """Removes all memoized photon spectra from this process"""
+    with _memo_lock:
+        _memo.clear()
+
+
+def _spectra_key(interactions, flavors, E):
+    """Returns a hex digest identifying the inputs of a set of photon spectra"""
+    digest = hashlib.sha1()
+    for item in (*(interaction.name for interaction in interactions), '', *(flavor.name for flavor in flavors)):
+        digest.update(item.encode())
+        digest.update(b'\0')
+    digest.update(np.ascontiguousarray(E, dtype=float).tobytes())
+    return digest.hexdigest()
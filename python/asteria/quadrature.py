@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""Adaptive quadrature over neutrino energy.
+
+The photon-weighted neutrino spectrum is smooth and thermal-like, apart from the kinks introduced by interaction
+thresholds in the photon spectrum. A composite Gauss-Legendre rule with panels refined where the integrand is poorly
+resolved integrates it to a requested tolerance using far fewer energies than a dense trapezoid grid.
+"""
+
+from __future__ import print_function, division
+
+from astropy import units as u
+
+import numpy as np
+import warnings
+
+
+class EnergyQuadrature:
+    """Composite Gauss-Legendre quadrature rule over neutrino energy
+    """
+    def __init__(self, edges, order=8, error=None):
+        """Creates a quadrature rule with one Gauss-Legendre panel between each pair of consecutive edges
+
+        Parameters
+        ----------
+        edges : astropy.units.Quantity
+            Sorted panel edges, the rule integrates over [edges[0], edges[-1]].
+        order : int
+            Number of Gauss-Legendre nodes per panel.
+        error : float or None
+            Estimated relative error of the rule, if known.
+        """
+        self.edges = edges.to(u.MeV)
+        self.order = order
+        self.error = error
+
+        _edges = self.edges.value
+        nodes, weights = zip(*(_gauss_legendre(a, b, order) for a, b in zip(_edges[:-1], _edges[1:])))
+        self._nodes = np.concatenate(nodes)
+        self._weights = np.concatenate(weights)
+
+    @property
+    def nodes(self):
+        """Energies at which the integrand must be evaluated"""
+        return self._nodes * u.MeV
+
+    @property
+    def weights(self):
+        """Quadrature weights corresponding to `nodes`"""
+        return self._weights * u.MeV
+
+    @property
+    def size(self):
+        """Number of nodes in the quadrature rule"""
+        return self._nodes.size
+
+    def integrate(self, values, axis=-1):
+        """Integrates the values of an integrand evaluated at `nodes` along an axis"""
+        return np.tensordot(np.moveaxis(values, axis, -1), self._weights, axes=1)
+
+
+def adaptive_quadrature(integrand, Emin, Emax, *, rtol=1e-4, order=8, n_panels=4, max_panels=1000):
+    """Builds a composite Gauss-Legendre rule by adaptively bisecting panels until the estimated error is below rtol
+
+    Parameters
+    ----------
+    integrand : callable
+        Function of a 1D array of energies in MeV (but not stored with astropy units), returning the integrand(s)
+        as an array with dim (..., energy). Every integrand is required to meet the tolerance.
+    Emin, Emax : astropy.units.Quantity
+        Integration range.
+    rtol : float
+        Relative tolerance on each integral.
+    order : int
+        Number of Gauss-Legendre nodes per panel.
+    n_panels : int
+        Number of equal-width panels used to start the refinement.
+    max_panels : int
+        Maximum number of panels, if reached a warning is issued and the rule is returned as-is.
+
+    Returns
+    -------
+    quadrature : EnergyQuadrature
+        Quadrature rule, with attribute `error` giving the estimated relative error.
+
+    Notes
+    -----
+    The error of a panel is estimated by comparing its single-panel integral with the sum of the integrals over its
+    two halves, and is normalized to the total integral. Panels are split until the summed error of all panels is
+    below `rtol` for every integrand. The error estimate is conservative as it applies to the coarser of the two
+    integrals. Each refinement pass splits all panels whose error is at least half of the largest, and evaluates the
+    integrand once for all of them; the halves of a split panel become the single-panel integrals of its children,
+    so they are not evaluated again.
+    """
+    _Emin = Emin.to(u.MeV).value
+    _Emax = Emax.to(u.MeV).value
+
+    def halves(panels):
+        """Returns the integrals over the left and right halves of each panel, with dim (..., panel)"""
+        bounds = [bound for a, b in panels for bound in ((a, 0.5 * (a + b)), (0.5 * (a + b), b))]
+        integrals = _integrate_panels(integrand, bounds, order)
+        return integrals[..., 0::2], integrals[..., 1::2]
+
+    # Panel (a, b) -> (integral over (a, b), integrals over its left and right halves)
+    edges = np.linspace(_Emin, _Emax, n_panels + 1)
+    initial = list(zip(edges[:-1], edges[1:]))
+    coarse = _integrate_panels(integrand, initial, order)
+    left, right = halves(initial)
+    panels = {panel: (coarse[..., idx], left[..., idx], right[..., idx]) for idx, panel in enumerate(initial)}
+
+    while True:
+        total = np.abs(sum(left + right for _, left, right in panels.values()))
+        norm = np.where(total > 0, total, 1)
+        panel_errors = {panel: np.abs(left + right - coarse) / norm for panel, (coarse, left, right) in panels.items()}
+        errors = {panel: np.max(panel_error) for panel, panel_error in panel_errors.items()}
+        error = np.max(sum(panel_errors.values()))
+        if error <= rtol:
+            break
+        if len(panels) >= max_panels:
+            warnings.warn(f"Maximum number of panels ({max_panels}) reached before tolerance ({rtol}), estimated "
+                          f"relative error is {error:.2e}")
+            break
+
+        max_error = max(errors.values())
+        split = sorted((panel for panel in panels if errors[panel] >= 0.5 * max_error), key=errors.get,
+                       reverse=True)[:max(1, (max_panels - len(panels)) // 2)]
+        children = []
+        for a, b in split:
+            _, left, right = panels.pop((a, b))
+            mid = 0.5 * (a + b)
+            children += [((a, mid), left), ((mid, b), right)]
+        left, right = halves([panel for panel, _ in children])
+        for idx, (panel, coarse) in enumerate(children):
+            panels[panel] = (coarse, left[..., idx], right[..., idx])
+
+    # The accepted integrals are those of the bisected panels, so the rule uses both halves of each panel
+    edges = sorted({edge for a, b in panels for edge in (a, 0.5 * (a + b), b)})
+    return EnergyQuadrature(np.array(edges) * u.MeV, order=order, error=error)
+
+
+def _gauss_legendre(a, b, order):
+    """Returns Gauss-Legendre nodes and weights on the interval [a, b]"""
+    x, w = np.polynomial.legendre.leggauss(order)
+    return 0.5 * (b - a) * x + 0.5 * (b + a), 0.5 * (b - a) * w
+
+
+def _integrate_panels(integrand, panels, order):
+    """Returns the integrals over each panel, with dim (..., panel), from one evaluation of the integrand"""
+    nodes, weights = zip(*(_gauss_legendre(a, b, order) for a, b in panels))
+    values = np.asarray(integrand(np.concatenate(nodes)))
+    return (values.reshape(values.shape[:-1] + (len(panels), order)) * np.array(weights)).sum(axis=-1)
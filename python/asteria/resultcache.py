@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""On-disk cache of simulation results.
+
+Results of Simulation.run are stored under a key derived from every parameter that determines them (model, energy
+and time grids, flavors, interactions, mixing and detector files). The progenitor distance is not part of the key,
+results are stored at the distance they were computed at and rescaled when loaded. Arrays are stored as .npy files
+and memory-mapped when loaded, a manifest records the entries of the cache and is used to evict the least recently
+used entries once the cache exceeds its size limit. Updates of the manifest by concurrent processes are serialized
+with a lock file (on platforms without fcntl, they are not, and concurrent updates may drop entries from the
+manifest).
+"""
+
+from __future__ import print_function, division
+
+from astropy import units as u
+from contextlib import contextmanager
+from snewpy.neutrino import Flavor
+
+import numpy as np
+import hashlib
+import json
+import os
+import shutil
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from ._version import __version__
+from .util import atomic_path, cache_path
+
+
+class ResultCache:
+    """Content-addressed on-disk cache of Simulation results
+    """
+    def __init__(self, cache_dir=os.path.join(cache_path, 'results'), max_size=2 ** 30):
+        """
+        Parameters
+        ----------
+        cache_dir : str, optional
+            Directory used to store results.
+        max_size : int, optional
+            Maximum total size of the stored results in bytes, the least recently used results are removed when it
+            is exceeded.
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    @property
+    def manifest_path(self):
+        """Path to the manifest, a JSON file describing each entry of the cache"""
+        return os.path.join(self.cache_dir, 'manifest.json')
+
+    def manifest(self):
+        """Returns the manifest as a dictionary keyed by entry key
+
+        Each entry contains the model description, the distance of the stored results in kpc, its size in bytes and
+        the times (in s since the epoch) it was created and last accessed. If the manifest is missing or cannot be
+        read, it is rebuilt from the stored entries.
+        """
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return self._rebuild_manifest()
+
+    def key(self, sim):
+        """Returns the hex digest identifying the parameters that determine the results of a Simulation"""
+        digest = hashlib.sha1()
+        model = sim.param['model']
+        for item in (__version__, model['name'], *(f'{key}={val}' for key, val in sorted(model['param'].items())),
+                     *(flavor.name for flavor in sim.flavors), *(interaction.name for interaction in sim.interactions),
+                     str(sim.hierarchy), str(sim.mixing_scheme), str(sim.mixing_angle)):
+            digest.update(item.encode())
+            digest.update(b'\0')
+        digest.update(np.ascontiguousarray(sim.energy.to(u.MeV).value, dtype=float).tobytes())
+        digest.update(np.ascontiguousarray(sim.time.to(u.s).value, dtype=float).tobytes())
+        for path in (sim._geomfile, sim._effvolfile):
+            with open(path, 'rb') as f:
+                digest.update(hashlib.sha1(f.read()).digest())
+        return digest.hexdigest()
+
+    def load(self, sim):
+        """Loads the results of a Simulation from the cache
+
+        Parameters
+        ----------
+        sim : asteria.simulation.Simulation
+            Simulation for which to load results
+
+        Returns
+        -------
+        result : dict or None
+            None if the results are not in the cache. Otherwise a dictionary with entries 'distance' (the distance
+            of the stored results, astropy.units.Quantity), 'E_per_V' (flavor-keyed dictionary of energy deposition
+            in MeV / m**3) and 'E_per_V_unmixed' (nested flavor-keyed dictionary of unmixed energy deposition, or
+            None), see Simulation.compute_energy_per_vol. Arrays are memory-mapped copy-on-write, so modifying them
+            does not modify the cache.
+        """
+        key = self.key(sim)
+        path = os.path.join(self.cache_dir, key)
+        try:
+            with open(os.path.join(path, 'meta.json')) as f:
+                meta = json.load(f)
+            E_per_V = {Flavor[name]: np.load(os.path.join(path, f'E_per_V_{name}.npy'), mmap_mode='c')
+                       for name in meta['flavors']}
+            E_per_V_unmixed = None
+            if meta['unmixed'] is not None:
+                E_per_V_unmixed = {Flavor[name]: {Flavor[produced]: np.load(os.path.join(
+                                       path, f'E_per_V_unmixed_{name}_{produced}.npy'), mmap_mode='c')
+                                   for produced in produced_flavors}
+                                   for name, produced_flavors in meta['unmixed'].items()}
+        except (OSError, ValueError, KeyError):
+            return None
+
+        with self._lock():
+            manifest = self.manifest()
+            if key in manifest:
+                manifest[key]['last_access'] = time.time()
+                self._write_manifest(manifest)
+        return {'distance': meta['distance'] * u.kpc, 'E_per_V': E_per_V, 'E_per_V_unmixed': E_per_V_unmixed}
+
+    def store(self, sim):
+        """Stores the results of a Simulation in the cache, then evicts the least recently used entries if the cache
+        exceeds its size limit
+
+        Parameters
+        ----------
+        sim : asteria.simulation.Simulation
+            Simulation whose results are stored, it must have been run
+        """
+        if sim._E_per_V is None:
+            raise RuntimeError("Simulation has not been executed yet, please use Simulation.run()")
+
+        key = self.key(sim)
+        path = os.path.join(self.cache_dir, key)
+        with atomic_path(path) as tmp_path:
+            os.makedirs(tmp_path, exist_ok=True)
+            for flavor, E_per_V in sim._E_per_V.items():
+                np.save(os.path.join(tmp_path, f'E_per_V_{flavor.name}.npy'), E_per_V)
+            unmixed = None
+            if sim._E_per_V_unmixed is not None:
+                unmixed = {flavor.name: [produced.name for produced in results]
+                           for flavor, results in sim._E_per_V_unmixed.items()}
+                for flavor, results in sim._E_per_V_unmixed.items():
+                    for produced, E_per_V in results.items():
+                        np.save(os.path.join(tmp_path, f'E_per_V_unmixed_{flavor.name}_{produced.name}.npy'),
+                                E_per_V)
+            meta = {'model': _describe(sim),
+                    'distance': sim.distance.to(u.kpc).value,
+                    'flavors': [flavor.name for flavor in sim._E_per_V],
+                    'unmixed': unmixed}
+            with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+                json.dump(meta, f)
+
+        with self._lock():
+            manifest = self.manifest()
+            now = time.time()
+            manifest[key] = {'model': meta['model'], 'distance': meta['distance'], 'size': _dir_size(path),
+                             'created': now, 'last_access': now}
+            self._evict(manifest)
+            self._write_manifest(manifest)
+
+    def remove(self, key):
+        """Removes an entry from the cache"""
+        with self._lock():
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            manifest = self.manifest()
+            if manifest.pop(key, None) is not None:
+                self._write_manifest(manifest)
+
+    def clear(self):
+        """Removes all entries from the cache"""
+        with self._lock():
+            for key in self.manifest():
+                shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            self._write_manifest({})
+
+    def _evict(self, manifest):
+        """Removes the least recently used entries from the manifest and disk, until the cache fits its size limit"""
+        total = sum(entry['size'] for entry in manifest.values())
+        for key in sorted(manifest, key=lambda key: manifest[key]['last_access']):
+            if total <= self.max_size:
+                break
+            total -= manifest.pop(key)['size']
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+
+    @contextmanager
+    def _lock(self):
+        """Holds an exclusive lock on the manifest, shared by all processes using this cache directory"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, 'manifest.lock'), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _write_manifest(self, manifest):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with atomic_path(self.manifest_path) as tmp_path, open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=1)
+
+    def _rebuild_manifest(self):
+        """Returns a manifest describing the entries found on disk"""
+        manifest = {}
+        if not os.path.isdir(self.cache_dir):
+            return manifest
+        for key in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, key)
+            if key.endswith('.tmp'):  # Entry being stored
+                continue
+            try:
+                with open(os.path.join(path, 'meta.json')) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            mtime = os.path.getmtime(path)
+            manifest[key] = {'model': meta['model'], 'distance': meta['distance'], 'size': _dir_size(path),
+                             'created': mtime, 'last_access': mtime}
+        return manifest
+
+
+def _describe(sim):
+    """Returns a short human-readable description of a Simulation's model"""
+    model = sim.param['model']
+    return f"{model['name']}: " + '; '.join(f'{key}, {val}' for key, val in model['param'].items())
+
+
+def _dir_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
@@ -0,0 +1,110 @@
+"""
+asteria.scripts.benchmark
+=========================
+
+Time the operations used repeatedly by trigger-significance studies, for a simulation of one model.
+
+With --compare, the same operations are also timed for another copy of ASTERIA, e.g. a checkout of an earlier
+revision made with `git worktree add`, to compare timings before and after a change.
+"""
+from __future__ import absolute_import, division, print_function
+
+from asteria.simulation import Simulation
+from asteria.interactions import Interactions
+
+from snewpy.neutrino import Flavor
+import numpy as np
+from astropy import units as u
+
+from argparse import ArgumentParser
+from timeit import Timer
+import json
+import os
+import subprocess
+import sys
+
+
+def parse(options=None):
+    """Parse command line options.
+    """
+    p = ArgumentParser(description='Benchmark of ASTERIA simulation operations')
+    p.add_argument('--model', dest='model', default='Nakazato_2013',
+                   help='SNEWPY model name.')
+    p.add_argument('--mass', dest='mass', type=float, default=13.,
+                   help='Progenitor mass [M_sun].')
+    p.add_argument('--tmax', dest='tmax', type=float, default=1.,
+                   help='End of simulated time range [s].')
+    p.add_argument('-n', '--number', dest='number', type=int, default=20,
+                   help='Number of calls per timing.')
+    p.add_argument('--compare', dest='compare', default=None,
+                   help='Directory containing another asteria package to time for comparison.')
+    p.add_argument('--json', dest='json', action='store_true',
+                   help='Print timings as JSON.')
+
+    if options is None:
+        return p.parse_args()
+    return p.parse_args(options)
+
+
+def benchmarks(sim):
+    """Returns a dictionary of named callables to be timed.
+    """
+    offsets = iter(np.random.randint(0, 500, size=10 ** 6) * u.ms)
+    distances = iter(np.random.uniform(1, 20, size=10 ** 6) * u.kpc)
+    t = sim.source.model.time[:100]
+    return {
+        'Source.flux': lambda: sim.source.flux(t, Flavor.NU_E_BAR),
+        'Simulation.rebin_result': lambda: sim.rebin_result(2 * u.ms, offset=next(offsets)),
+        'Simulation.scale_result': lambda: sim.scale_result(next(distances)),
+        'Simulation.detector_signal': lambda: sim.detector_signal(2 * u.ms, offset=next(offsets)),
+        'Simulation.trigger_significance': lambda: sim.trigger_significance(dt=0.5 * u.s, offset=next(offsets),
+                                                                            binnings=[0.5, 1.5] * u.s),
+    }
+
+
+def timings(args):
+    """Returns the best time per call in s of each benchmark, for a simulation set up from the command line options.
+    """
+    model = {'name': args.model,
+             'param': {'progenitor_mass': args.mass * u.Msun, 'revival_time': 300 * u.ms,
+                       'metallicity': 0.02, 'eos': 'shen'}}
+    interactions = [interaction for interaction in Interactions if interaction.name in
+                    ('InvBetaPar', 'ElectronScatter', 'Oxygen16CC', 'Oxygen16NC', 'Oxygen18')]
+    sim = Simulation(model=model, distance=10 * u.kpc, Emin=0 * u.MeV, Emax=100 * u.MeV, dE=1 * u.MeV,
+                     tmin=-1 * u.s, tmax=args.tmax * u.s, dt=1 * u.ms, interactions=interactions)
+    sim.run()
+
+    return {name: min(Timer(func).repeat(repeat=3, number=args.number)) / args.number
+            for name, func in benchmarks(sim).items()}
+
+
+def reference_timings(args):
+    """Returns the timings of the asteria package in directory `args.compare`, timed in a separate process.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([args.compare, os.environ.get('PYTHONPATH', '')]))
+    options = ['--model', args.model, '--mass', str(args.mass), '--tmax', str(args.tmax), '-n', str(args.number),
+               '--json']
+    output = subprocess.run([sys.executable, os.path.abspath(__file__)] + options, env=env, check=True,
+                            stdout=subprocess.PIPE, universal_newlines=True).stdout
+    # Only the last line is the JSON output, the simulation may print progress before it
+    return json.loads(output.splitlines()[-1])
+
+
+def main(options=None):
+    args = parse(options)
+    reference = reference_timings(args) if args.compare is not None else None
+    results = timings(args)
+
+    if args.json:
+        print(json.dumps(results))
+    elif reference is None:
+        for name, best in results.items():
+            print(f'{name:<36s} {1e3 * best:10.3f} ms')
+    else:
+        print(f'{"":<36s} {"reference":>13s} {"current":>13s} {"speedup":>8s}')
+        for name, best in results.items():
+            print(f'{name:<36s} {1e3 * reference[name]:10.3f} ms {1e3 * best:10.3f} ms {reference[name] / best:7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,7 @@ from asteria.config import load_config, Configuration
 from asteria.source import initialize, Source
 from asteria.neutrino import Flavor
 from asteria.interactions import Interactions
+from asteria.photonspectra import get_photon_spectra
 import asteria.IO as io
 
 import numpy as np
@@ -115,15 +116,8 @@ def main(args=None):
     time = np.arange(t_min, t_max, dt) * u.s
 
 	# Compute charged particle spectra.
-    photon_spectra = np.zeros(shape=(len(Flavor), Enu.size))
-
-    for nu, flavor in enumerate(Flavor):
-        for interaction in Interactions: 
-            xs    = interaction.cross_section(flavor, Enu).to(u.m**2).value
-            E_lep = interaction.mean_lepton_energy(flavor, Enu).value
-            scale = interaction.photon_scaling_factor(flavor).to(1/u.MeV).value
-            photon_spectra[nu] +=  xs * E_lep * scale # u.m**2 
-    photon_spectra *= u.m**2
+    photon_spectra = get_photon_spectra(Interactions, Flavor, Enu)
+    photon_spectra = np.array([photon_spectra[flavor].to(u.m**2).value for flavor in Flavor]) * u.m**2
 
     # Compute signal per DOM.
     E_per_V = np.zeros( shape=(len(Flavor), time.size) )
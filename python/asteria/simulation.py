@@ -13,15 +13,30 @@ from astropy import units as u
 from snewpy.neutrino import Flavor, MassHierarchy
 from snewpy import flavor_transformation as ft
 from math import ceil
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from collections import OrderedDict
 
 import numpy as np
 import configparser
 import warnings
 import os
+import re
+import threading
+import tracemalloc
 
 from .interactions import Interactions
 from .source import Source
 from .detector import Detector
+from .yieldtable import PhotonYieldTable
+from .quadrature import adaptive_quadrature
+from .resultcache import ResultCache
+from .photonspectra import compute_photon_spectra, get_photon_spectra
+from .trigger import significance, max_significance, expected_significance
+from scipy.interpolate import PchipInterpolator
+
+
+_E_per_V_unit = u.MeV / u.m ** 3
 
 
 class Simulation:
@@ -73,34 +88,31 @@ class Simulation:
             self.distance = distance
             self.energy = E
             self.time = t
-            self._sim_dt = _dt
-            self._res_dt = res_dt
-            self._res_offset = 0 * u.s  # TODO: Add config/arg option for this
+            # Time steps are stored in s (but not with astropy units), see Simulation.rebin_result
+            self._sim_dt = _dt.to(u.s).value
+            self._res_dt = res_dt.to(u.s).value
+            self._res_offset = 0.  # TODO: Add config/arg option for this
+            self._res_distance = None  # Progenitor distance of the rebinned results in kpc, see _rebin_result
             if flavors is None:
                 self.flavors = Flavor
             else:
                 self.flavors = flavors
 
-            if not hierarchy or hierarchy.upper() == 'DEFAULT':
-                self.hierarchy = MassHierarchy.NORMAL
-            else:
-                self.hierarchy = getattr(MassHierarchy, hierarchy.upper())
-
-            self.mixing_scheme = mixing_scheme
             self.mixing_angle = mixing_angle
-            if mixing_scheme:
-                if mixing_scheme == 'NoTransformation':
-                    self._mixing = getattr(ft, mixing_scheme)()
-                else:
-                    # TODO: Improve mixing name checking, this argument is case sensitive
-                    self._mixing = getattr(ft, mixing_scheme)(mh=self.hierarchy)
-            else:
-                self._mixing = ft.NoTransformation()
+            self._set_mixing_scheme(mixing_scheme, hierarchy)
 
             self.interactions = interactions
             self._E_per_V = None
+            self._E_per_V_cumulative = {}
+            self._E_per_V_unmixed = None
+            # Options of the last call to compute_energy_per_vol, reused by set_mixing
+            self._energy_per_vol_options = {}
+            # Rebinned results and deadtime efficiencies, keyed by (dt, offset, distance), see rebin_result
+            self.rebin_cache_size = 16
+            self._rebin_cache = OrderedDict()
             self._total_E_per_V = None
             self._photon_spectra = None
+            self._energy_quadrature = None
             self._create_paramdict(model, distance, flavors, hierarchy, interactions, mixing_scheme, mixing_angle, E, t)
 
             if not geomfile:
@@ -217,37 +229,100 @@ class Simulation:
             'interactions': interactions,
         })
 
-    def run(self, load_simulation=False):
+    def _set_mixing_scheme(self, mixing_scheme=None, hierarchy=None):
+        if not hierarchy or hierarchy.upper() == 'DEFAULT':
+            self.hierarchy = MassHierarchy.NORMAL
+        else:
+            self.hierarchy = getattr(MassHierarchy, hierarchy.upper())
+
+        self.mixing_scheme = mixing_scheme
+        if mixing_scheme:
+            if mixing_scheme == 'NoTransformation':
+                self._mixing = getattr(ft, mixing_scheme)()
+            else:
+                # TODO: Improve mixing name checking, this argument is case sensitive
+                self._mixing = getattr(ft, mixing_scheme)(mh=self.hierarchy)
+        else:
+            self._mixing = ft.NoTransformation()
+
+    def set_mixing(self, mixing_scheme=None, hierarchy=None):
+        """Changes the flavor mixing scheme and mass hierarchy used by this Simulation.
+
+        If the simulation has already been run, its result is updated. For energy-independent mixing schemes
+        (e.g. NoTransformation, AdiabaticMSW) the new mixing matrix is applied to the stored unmixed per-flavor
+        energy deposition, so the SNEWPY model is not re-evaluated. Otherwise, the energy deposition is recomputed
+        with the options of the last call to Simulation.compute_energy_per_vol.
+
+        Parameters
+        ----------
+        mixing_scheme : str or None
+            Name of SNEWPY flavor transformation (e.g. 'AdiabaticMSW'), if None, NoTransformation is used.
+        hierarchy : str or None
+            Neutrino mass hierarchy ('normal' or 'inverted'), if None, the normal hierarchy is used.
+
+        Returns
+        -------
+        None
+        """
+        self._set_mixing_scheme(mixing_scheme, hierarchy)
+        self.param.update({'mixing_scheme': mixing_scheme, 'hierarchy': hierarchy})
+        for key, val in (('mixing_scheme', mixing_scheme), ('hierarchy', hierarchy)):
+            if val is not None:
+                self.metadata[key] = str(val)
+            else:
+                self.metadata.pop(key, None)
+
+        if self._E_per_V is None:
+            return
+        mixing_matrix = self._get_mixing_matrix(self._mixing)
+        if self._E_per_V_unmixed is not None and mixing_matrix is not None:
+            self._apply_mixing(mixing_matrix)
+        else:
+            self.compute_energy_per_vol(**self._energy_per_vol_options)
+
+    def run(self, load_simulation=False, *, cache=None):
         """Simulates the photonic energy per volume in the IceCube Detector or loads an existing simulation
 
-        :param load_simulation: indicates whether or not to attempt to load an existing simulation
+        :param load_simulation: indicates whether or not to attempt to load an existing simulation from the on-disk
+            result cache. If no result is found, the simulation is run and its result is stored in the cache.
         :type load_simulation: bool
+        :param cache: result cache used when `load_simulation` is True, if None the default cache is used
+        :type cache: asteria.resultcache.ResultCache or None
         :return: None
         :rtype: None
         """
+        self.compute_photon_spectra()
         if load_simulation:
-            raise NotImplementedError('Simulation loading is not currently implemented')
+            cache = ResultCache() if cache is None else cache
+            result = cache.load(self)
+            if result is not None:
+                distance = self.distance
+                self.distance = result['distance']
+                self._E_per_V_unmixed = result['E_per_V_unmixed']
+                self._set_result(result['E_per_V'])
+                self.scale_result(distance)
+                return
 
-        self.compute_photon_spectra()
         self.compute_energy_per_vol()
+        if load_simulation:
+            cache.store(self)
         return
 
-    def compute_photon_spectra(self):
+    def compute_photon_spectra(self, *, cache_dir=None):
         """Computes the spectrum of photons produced by neutrino interactions in the IceCube Detector
             Data are stored in SimulationHandler.photon_spectra
+            Spectra are shared (read-only) with other simulations using the same interactions, flavors and
+            energies, see asteria.photonspectra.get_photon_spectra
+        :param cache_dir: directory used to persist spectra on disk, if None spectra are only memoized in memory
+        :type cache_dir: str or None
         :return: None
         :rtype: None
         """
-        self._photon_spectra = {}
+        self._photon_spectra = self._compute_photon_spectra(self.energy, cache_dir=cache_dir)
 
-        for flavor in self.flavors:
-            result = np.zeros(self.energy.size)
-            for interaction in self.interactions:
-                xs = interaction.cross_section(flavor, self.energy).to(u.m ** 2).value
-                E_lep = interaction.mean_lepton_energy(flavor, self.energy).value
-                photon_scaling_factor = interaction.photon_scaling_factor(flavor).value
-                result += xs * E_lep * photon_scaling_factor
-            self._photon_spectra.update({flavor: result * (u.m * u.m)})
+    def _compute_photon_spectra(self, E, *, cache_dir=None):
+        """Returns flavor-keyed dictionary of photon spectra evaluated at energies `E`, see compute_photon_spectra"""
+        return get_photon_spectra(self.interactions, self.flavors, E, cache_dir=cache_dir)
 
     def get_combined_spectrum(self, t, E, flavor, mixing):
         """Returns mixed neutrino spectrum as a function of time and energy arising from flavor oscillations
@@ -268,14 +343,239 @@ class Simulation:
         spectrum : np.ndarray
             Mixed neutrino spectrum as a 2D array with dim (time, energy)
         """
-        nu_spectrum = self.source.model.get_transformed_spectra(t, E, mixing)[flavor].reshape(t.size, E.size)
-        cut = (t < self.source.model.time[0]) | (self.source.model.time[-1] < t)
-        # TODO: Apply a fix for this once a fix has been applied to SNEWPY
-        nu_spectrum[cut] = 0
+        nu_spectrum = self._get_transformed_spectra(t, E, mixing)[flavor]
         photon_spectrum = self._photon_spectra[flavor].reshape(1, E.size)
-        return nu_spectrum.to(1 / u.MeV / u.s).value * photon_spectrum.to(u.m ** 2).value
+        return nu_spectrum * photon_spectrum.to(u.m ** 2).value
+
+    def _get_transformed_spectra(self, t, E, mixing=None):
+        """Returns mixed neutrino spectra for all flavors from a single evaluation of the SNEWPY model
+
+        Parameters
+        ----------
+        t : astropy.quantity.Quantity
+            Array of times used to perform calculation
+        E : astropy.quantity.Quantity
+            Array of energies used to perform calculation
+        mixing : snewpy.flavor_transformation.FlavorTransformation or None
+            Mixing scheme used to perform calcuation, if None the initial (unmixed) spectra are returned
+
+        Returns
+        -------
+        spectra : dict
+            Flavor-keyed dictionary of mixed neutrino spectra, each a 2D array with dim (time, energy)
+            in units 1 / (MeV s) (but not stored with astropy units).
+        """
+        return _get_model_spectra(self.source.model, t, E, mixing)
+
+    def _compute_table_yield(self, t, integrands):
+        """Computes the photon-weighted integrals over energy of the unmixed spectra using a PhotonYieldTable
+
+        Parameters
+        ----------
+        t : astropy.quantity.Quantity
+            Array of times used to perform calculation
+        integrands : dict
+            Flavor-keyed dictionary, where each value is a list of the (produced) flavors whose neutrino spectrum
+            is to be integrated against the photon spectrum of the key (detected) flavor.
+
+        Returns
+        -------
+        result : dict
+            Nested flavor-keyed dictionary of the integrals in units MeV / s (but not stored with astropy units)
+        """
+        model = self.source.model
+        if not all([hasattr(model, attr) for attr in ("luminosity", "meanE", "pinch")]):
+            raise NotImplementedError(f"Method 'table' requires a model with attributes 'luminosity', 'meanE' and "
+                                      f"'pinch', model '{model.__class__.__name__}' lacks one or more of these")
+        table = PhotonYieldTable.from_cache(self.energy, {flavor: self._photon_spectra[flavor]
+                                                          for flavor in integrands})
+
+        # Model parameters are linearly interpolated, consistent with SNEWPY's get_initial_spectra
+        t = t.to(model.time.unit).value
+        model_t = model.time.value
+        cut = (t < model_t[0]) | (model_t[-1] < t)
+        flux = {}
+        params = {}
+        for produced in {produced for produced_flavors in integrands.values() for produced in produced_flavors}:
+            L = np.interp(t, model_t, model.luminosity[produced].to(u.MeV / u.s).value)
+            meanE = np.interp(t, model_t, model.meanE[produced].to(u.MeV).value)
+            alpha = np.interp(t, model_t, model.pinch[produced])
+            flux[produced] = np.divide(L, meanE, where=(meanE > 0) & ~cut, out=np.zeros(t.size))
+            params[produced] = (alpha, np.where(cut, 0, meanE))
+
+        return {flavor: {produced: flux[produced] * table(*params[produced], flavor) for produced in produced_flavors}
+                for flavor, produced_flavors in integrands.items()}
+
+    def _get_adaptive_time_nodes(self, edges, flavors, rtol):
+        """Returns the times at which the spectra must be evaluated to resolve the luminosity and mean energy
+
+        Candidate times are the result bin edges, clipped to the model time range. Of these, the fewest are kept
+        such that the linear interpolation of `Source.luminosity` and `Source.meanE` between them is accurate to
+        `rtol` (relative to the maximum of each curve), so the grid is fine around bounce and other fast transients
+        and coarse on the smooth cooling tail.
+
+        Parameters
+        ----------
+        edges : astropy.quantity.Quantity
+            Edges of the time bins onto which the result is integrated
+        flavors : iterable of snewpy.neutrino.Flavor
+            Flavors whose luminosity and mean energy are to be resolved
+        rtol : float
+            Relative tolerance of the linear interpolation
+
+        Returns
+        -------
+        t : astropy.quantity.Quantity
+            Sorted array of times
+        """
+        model_time = self.source.model.time
+        t = np.unique(np.clip(edges.to(model_time.unit).value, model_time[0].value, model_time[-1].value))
+        if t.size < 3:
+            return t * model_time.unit
+        try:
+            curves = np.array([curve(t, flavor) for flavor in flavors
+                               for curve in (self.source._luminosity, self.source._meanE)])
+        except NotImplementedError:
+            raise NotImplementedError(f"Time grid 'adaptive' requires a model with attributes 'luminosity' and "
+                                      f"'meanE', model '{self.source.model.__class__.__name__}' lacks one or more of these")
+        return t[_select_nodes(t, curves, rtol)] * model_time.unit
+
+    def _get_native_time_nodes(self, edges):
+        """Returns the model time samples within the range of `edges`, along with the (clipped) first and last edge
+
+        Parameters
+        ----------
+        edges : astropy.quantity.Quantity
+            Edges of the time bins onto which the result is integrated
+
+        Returns
+        -------
+        t : astropy.quantity.Quantity
+            Sorted array of times
+        """
+        model_time = self.source.model.time
+        _edges = edges.to(model_time.unit).value
+        _model_time = model_time.value
+        t = np.concatenate([np.clip(_edges[[0, -1]], _model_time[0], _model_time[-1]),
+                            _model_time[(_edges[0] < _model_time) & (_model_time < _edges[-1])]])
+        return np.unique(t) * model_time.unit
+
+    def _get_energy_quadrature(self, integrands, mixing, rtol):
+        """Returns an adaptive quadrature rule over the range of `self.energy` for the photon-weighted spectra
+
+        The rule is refined using the integrands evaluated at up to 16 probe times, spread over the model time
+        samples that fall within the simulation time range.
+
+        Parameters
+        ----------
+        integrands : dict
+            Flavor-keyed dictionary, see _compute_partition
+        mixing : snewpy.flavor_transformation.FlavorTransformation or None
+            Mixing scheme used to perform calcuation, if None the initial (unmixed) spectra are used
+        rtol : float
+            Relative tolerance of the integral over neutrino energy
+
+        Returns
+        -------
+        quadrature : asteria.quadrature.EnergyQuadrature
+        """
+        model_time = self.source.model.time
+        probe_t = model_time[(self.time[0] <= model_time) & (model_time <= self.time[-1])]
+        if probe_t.size == 0:
+            probe_t = self.time
+        probe_t = probe_t[np.unique(np.linspace(0, probe_t.size - 1, 16).astype(int))]
+
+        def integrand(E):
+            _E = E * u.MeV
+            # Probe energies are not memoized, only the spectra at the final nodes are, see compute_energy_per_vol
+            photon_spectra = {flavor: spectrum.to_value(u.m ** 2) for flavor, spectrum in
+                              compute_photon_spectra(self.interactions, self.flavors, _E).items()}
+            spectra = _get_model_spectra(self.source.model, probe_t, _E, mixing)
+            return np.array([spectra[produced] * photon_spectra[flavor]
+                             for flavor, produced_flavors in integrands.items() for produced in produced_flavors])
+
+        return adaptive_quadrature(integrand, self.energy[0], self.energy[-1], rtol=rtol)
+
+    def _get_mixing_matrix(self, mixing):
+        """Returns the flavor transformation as a matrix if it is independent of time and energy
+
+        Parameters
+        ----------
+        mixing : snewpy.flavor_transformation.FlavorTransformation
+            Mixing scheme used to perform calcuation
+
+        Returns
+        -------
+        mixing_matrix : np.ndarray or None
+            Array with dim (flavor, flavor), where element [i, j] is the probability that a neutrino produced with
+            flavor `Flavor(j)` is detected with flavor `Flavor(i)`. None if the mixing scheme depends on time or
+            energy, and so cannot be expressed as a single matrix.
+        """
+        probs = {(Flavor.NU_E, Flavor.NU_E): mixing.prob_ee,
+                 (Flavor.NU_E, Flavor.NU_X): mixing.prob_ex,
+                 (Flavor.NU_X, Flavor.NU_E): mixing.prob_xe,
+                 (Flavor.NU_X, Flavor.NU_X): mixing.prob_xx,
+                 (Flavor.NU_E_BAR, Flavor.NU_E_BAR): mixing.prob_eebar,
+                 (Flavor.NU_E_BAR, Flavor.NU_X_BAR): mixing.prob_exbar,
+                 (Flavor.NU_X_BAR, Flavor.NU_E_BAR): mixing.prob_xebar,
+                 (Flavor.NU_X_BAR, Flavor.NU_X_BAR): mixing.prob_xxbar}
+
+        # Probe the transformation at the edges and center of the time and (non-zero) energy ranges
+        _E = self.energy[self.energy.value > 0]
+        probe_t = self.time[[0, self.time.size // 2, -1]]
+        probe_E = _E[[0, _E.size // 2, -1]] if _E.size > 0 else [1] * u.MeV
+
+        mixing_matrix = np.zeros((len(Flavor), len(Flavor)))
+        for (detected, produced), prob in probs.items():
+            try:
+                values = np.array([np.asarray(prob(_t, _E)).astype(float) for _t in probe_t for _E in probe_E])
+            except (TypeError, ValueError, u.UnitsError):
+                return None
+            if values.size != probe_t.size * len(probe_E) or not np.allclose(values, values[0], rtol=1e-12, atol=0):
+                return None
+            mixing_matrix[detected.value, produced.value] = values[0]
+        return mixing_matrix
+
+    def _apply_mixing(self, mixing_matrix):
+        """Computes the energy deposition of each flavor from the stored unmixed energy deposition
+
+        Parameters
+        ----------
+        mixing_matrix : np.ndarray
+            Flavor transformation matrix, see Simulation._get_mixing_matrix
+        """
+        results = {}
+        for flavor in self.flavors:
+            results[flavor] = sum(mixing_matrix[flavor.value, produced.value] * E_per_V
+                                  for produced, E_per_V in self._E_per_V_unmixed[flavor].items())
+        self._set_energy_per_vol(results)
+
+    def _set_energy_per_vol(self, results):
+        """Stores the flavor-keyed energy deposition results (in MeV / m**3) and rebins them
+
+        Results are stored without astropy units, which are attached by the public properties (E_per_V, etc.)
+        """
+        E_per_V = {}
+        for flavor, result in results.items():
+            if not flavor.is_electron:  # nu_x/nu_x_bar consist of nu_mu(_bar) & nu_tau(_bar), so double them
+                # TODO: Double check that the models describe single flavor spectrum or multi-flavor spectrum
+                result = 2 * result
+            E_per_V.update({flavor: result})
+        self._set_result(E_per_V)
+
+    def _set_result(self, E_per_V):
+        """Stores the flavor-keyed energy deposition (in MeV / m**3) of each detected flavor and rebins it"""
+        self._E_per_V = E_per_V
+        self._E_per_V_cumulative = {}  # Cumulative sums used for rebinning, see _rebin_result
+        self.clear_rebin_cache()
+        self._total_E_per_V = np.zeros(self.time.size)
+        for result in E_per_V.values():
+            self._total_E_per_V += result
+
+        self._rebin_result(self._res_dt, force_rebin=True)
 
-    def compute_energy_per_vol(self, *, part_size=1000):
+    def compute_energy_per_vol(self, *, part_size=1000, memory_limit=None, workers=None, executor=None,
+                               method='trapz', rtol=1e-4, time_grid='uniform', time_rtol=1e-3):
         """Compute the energy deposited in a cubic meter of ice by photons
         from SN neutrino interactions.
 
@@ -285,68 +585,197 @@ class Simulation:
         part_size : int
            Maximum number of time steps to compute at once. A temporary numpy array
            of size n x time.size is created and can be very memory inefficient.
+        memory_limit : int, float, str or None, optional
+           Memory budget for evaluating one partition, overrides `part_size`. An int is interpreted as a number
+           of bytes and a float in (0, 1] as a fraction of the total system memory. A str is a number of bytes with
+           a unit (e.g. '512MB', '2 GiB') or a percentage of the total system memory (e.g. '25%'). The partition size is
+           estimated from the size of the (time, energy) arrays, then adapted using the measured peak memory usage
+           of the first partition. When worker processes are used, this budget applies to each worker.
+        workers : int or None, optional
+           Number of worker processes used to compute the time partitions in parallel.
+           If None (and no `executor` is provided), partitions are computed serially in this process.
+        executor : concurrent.futures.Executor or None, optional
+           Executor used to compute the time partitions, takes precedence over `workers`.
+           Each worker process keeps a copy of the SNEWPY model between partitions.
+        method : str, optional
+           Method used to perform the integral over neutrino energy.
+           'trapz' (default) evaluates the SNEWPY model spectra and integrates them with the trapezoid rule.
+           'table' uses a cached PhotonYieldTable of the photon-weighted integral of alpha-fit spectra, see
+           asteria.yieldtable. It requires a model with `luminosity`, `meanE` and `pinch` and a mixing scheme
+           that is independent of time and energy, and does not evaluate the SNEWPY model spectra.
+           'quadrature' evaluates the SNEWPY model spectra only at the nodes of an adaptive Gauss-Legendre rule
+           over the range of `Simulation.energy`, see asteria.quadrature.adaptive_quadrature. It is faster than
+           'trapz' when the rule has fewer nodes than `Simulation.energy` (e.g. ~250 nodes at the default `rtol`).
+        rtol : float, optional
+           Relative tolerance of the integral over neutrino energy, used only by method 'quadrature'.
+        time_grid : str, optional
+           Times at which the spectra are evaluated.
+           'uniform' (default) evaluates the spectra at each time in `Simulation.time`.
+           'adaptive' evaluates the spectra only at the times needed to resolve the luminosity and mean energy of
+           the source to `time_rtol`, see Simulation._get_adaptive_time_nodes, and requires a model with
+           `luminosity` and `meanE`.
+           'native' evaluates the spectra only at the time samples of the SNEWPY model, see
+           Simulation._get_native_time_nodes.
+           For 'adaptive' and 'native', the photon-weighted rate is integrated onto the bins of `Simulation.time`
+           using a monotone (Pchip) interpolant. 'uniform' instead takes the rate at the leading edge of each bin
+           (left-point rule), so the energy deposition in individual bins differs between time grids by up to a few
+           percent where the rate changes quickly within a bin (e.g. near bounce), while totals agree to ~1e-4.
+        time_rtol : float, optional
+           Relative tolerance of the time grid, used only by time grid 'adaptive'.
 
         Returns
         -------
         E_per_V
            Energy per m**3 of ice deposited  by neutrinos of requested flavor
+
+        Notes
+        -----
+        The SNEWPY model is evaluated once per partition of time steps, and all flavors are integrated from the
+        result of that evaluation.
         """
         if self.time.size < 2:
             raise ValueError("Time array size <2, unable to compute energy per volume.")
 
-        H2O_in_ice = 3.053e28  # 1 / u.m**3
-        dist = self.distance.to(u.m).value  # m**2
+        if method not in ('trapz', 'table', 'quadrature'):
+            raise ValueError(f"Unknown method: {method}, expected ('trapz', 'table', 'quadrature')")
 
-        self._E_per_V = {}
-        self._total_E_per_V = np.zeros(self.time.size)
+        if time_grid not in ('uniform', 'adaptive', 'native'):
+            raise ValueError(f"Unknown time grid: {time_grid}, expected ('uniform', 'adaptive', 'native')")
 
-        if self.source.special_compat_mode:
-            part_size = 1  # Done for certain SNEWPY Models until a fix has been applied
-            # These models can only return spectra for 1 time per call.
-            # TODO: Fix this once a fix has been applied to SNEWPY
+        # Executors are not kept, as they may be shut down before the options are reused
+        self._energy_per_vol_options = {'part_size': part_size, 'memory_limit': memory_limit, 'workers': workers,
+                                        'method': method, 'rtol': rtol, 'time_grid': time_grid,
+                                        'time_rtol': time_rtol}
+        if executor is None and workers is not None and workers > 1 and method != 'table':
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return self.compute_energy_per_vol(part_size=part_size, memory_limit=memory_limit, workers=workers,
+                                                   executor=executor, method=method, rtol=rtol,
+                                                   time_grid=time_grid, time_rtol=time_rtol)
 
-        # Perform core calculation on partitions in E to regulate memory usage in vectorized function
-        # Maximum usage is expected to be ~8MB
-        for flavor in self.flavors:
-            result = np.zeros(self.time.size)
-            idx = 0
-
-            # Perform integration over spectrum
-            if part_size < self.time.size:
-                for idx in np.arange(0, self.time.size, part_size):
-                    spectrum = self.get_combined_spectrum(self.time[idx:idx + part_size], self.energy, flavor,
-                                                          self._mixing)
-                    result[idx:idx + part_size] = np.trapz(spectrum, self.energy.value, axis=1)
-
-            result *= (
-                H2O_in_ice *  # Target Molecule (H2O) density
-                np.ediff1d(self.time, to_end=(self.time[-1] - self.time[-2])).value *  # Time bin scaling
-                1 / (4 * np.pi * dist ** 2)  # Distance
-            )
+        H2O_in_ice = 3.053e28  # 1 / u.m**3
+        dist = self.distance.to(u.m).value  # m**2
 
-            if not flavor.is_electron:  # nu_x/nu_x_bar consist of nu_mu(_bar) & nu_tau(_bar), so double them
-                # TODO: Double check that the models describe single flavor spectrum or multi-flavor spectrum
-                result *= 2
-            self._E_per_V.update({flavor: result * (u.MeV / u.m / u.m / u.m)})
-            self._total_E_per_V += result
+        # Energy-independent mixing schemes are linear combinations of the unmixed spectra, so the unmixed
+        # spectrum of each flavor is integrated against the photon spectrum of each detected flavor it can mix into.
+        # The result can later be re-mixed without re-evaluating the SNEWPY model, see Simulation.set_mixing
+        mixing_matrix = self._get_mixing_matrix(self._mixing)
+        if mixing_matrix is not None:
+            mixing = None
+            produced_flavors = {flavor: [produced for produced in Flavor if produced.is_neutrino == flavor.is_neutrino]
+                                for flavor in self.flavors}
+        else:
+            mixing = self._mixing
+            produced_flavors = {flavor: [flavor] for flavor in self.flavors}
+
+        # Leading edges of the time bins, and the trailing edge of the last bin
+        edges = np.append(self.time, self.time[-1] + (self.time[-1] - self.time[-2]))
+        if time_grid == 'adaptive':
+            t = self._get_adaptive_time_nodes(edges, set(chain.from_iterable(produced_flavors.values())), time_rtol)
+        elif time_grid == 'native':
+            t = self._get_native_time_nodes(edges)
+        else:
+            t = self.time
+        results = {flavor: {produced: np.zeros(t.size) for produced in produced_flavors[flavor]}
+                   for flavor in self.flavors}
+
+        # Perform core calculation on partitions in t to regulate memory usage in vectorized function
+        # Maximum usage is expected to be ~8MB per flavor for the default partition size and 100 energy bins
+        integrands = {flavor: list(results[flavor]) for flavor in self.flavors}
+
+        # The photon spectrum and quadrature weights are folded into one weight vector per flavor, so the integral
+        # over energy is a single matrix-vector product per partition
+        if method == 'quadrature':
+            self._energy_quadrature = self._get_energy_quadrature(integrands, mixing, rtol)
+            energy = self._energy_quadrature.nodes
+            quad_weights = self._energy_quadrature.weights.value
+            photon_spectra = self._compute_photon_spectra(energy)
+        else:
+            energy = self.energy
+            quad_weights = _trapz_weights(self.energy.value)
+            photon_spectra = self._photon_spectra
+        weights = {flavor: photon_spectra[flavor].to(u.m ** 2).value * quad_weights for flavor in self.flavors}
+
+        # The model spectra are zero outside of the model time range, so only times within it are evaluated
+        model_time = self.source.model.time
+        idx_valid = np.flatnonzero((model_time[0] <= t) & (t <= model_time[-1]))
+        idx_start, idx_stop = (idx_valid[0], idx_valid[-1] + 1) if idx_valid.size > 0 else (0, 0)
+
+        first_partition = []
+        if method == 'table':
+            if mixing_matrix is None:
+                raise ValueError(f"Method 'table' requires a mixing scheme that is independent of time and energy, "
+                                 f"given {self._mixing.__class__.__name__}")
+            first_partition = [(0, self._compute_table_yield(t, integrands))]
+            idx_start = idx_stop
+        elif memory_limit is not None and idx_start < idx_stop:
+            budget = _parse_memory_limit(memory_limit)
+            # Initial estimate: The model returns one (time, energy) array per flavor, and creates a few temporary
+            # arrays per flavor while doing so.
+            n_arrays = 4 * len(Flavor)
+            part_size = max(1, int(budget / (n_arrays * energy.size * np.dtype(float).itemsize)))
+
+            # Measure the actual peak memory used by the first partition, and adapt the size of the rest
+            partition_result, peak = _measure_peak_memory(_compute_partition, self.source.model,
+                                                          t[idx_start:min(idx_start + part_size, idx_stop)],
+                                                          energy, weights, integrands, mixing)
+            first_partition = [(idx_start, partition_result)]
+            idx_start = min(idx_start + part_size, idx_stop)
+            if peak:
+                part_size = max(1, int(part_size * budget / peak))
+
+        partitions = [(idx, min(idx + part_size, idx_stop)) for idx in range(idx_start, idx_stop, part_size)]
+        if executor is not None:
+            # Partitions are submitted with times/energies in s/MeV, each worker re-creates the model once
+            args = [(self.param['model'], t[start:stop].to(u.s).value, energy.to(u.MeV).value,
+                     weights, integrands, mixing) for start, stop in partitions]
+            partition_results = executor.map(_compute_partition_worker, *zip(*args)) if args else []
+        else:
+            partition_results = (_compute_partition(self.source.model, t[start:stop], energy,
+                                                    weights, integrands, mixing) for start, stop in partitions)
 
-        self._total_E_per_V *= (u.MeV / u.m / u.m / u.m)
-        self.rebin_result(dt=self._res_dt, force_rebin=True)
+        for idx, partition_result in chain(first_partition, zip((start for start, _ in partitions),
+                                                                partition_results)):
+            for flavor in self.flavors:
+                for produced, result in results[flavor].items():
+                    _result = partition_result[flavor][produced]
+                    result[idx:idx + _result.size] = _result
+
+        scale = (
+            H2O_in_ice *  # Target Molecule (H2O) density
+            1 / (4 * np.pi * dist ** 2)  # Distance
+        )
+        for flavor_results in results.values():
+            for produced, result in flavor_results.items():
+                if time_grid == 'uniform':
+                    result *= np.diff(edges.to(u.s).value)  # Time bin scaling
+                else:
+                    result = _integrate_rate(t.to(u.s).value, result, edges.to(u.s).value)
+                flavor_results[produced] = result * scale
+
+        if mixing_matrix is not None:
+            self._E_per_V_unmixed = results
+            self._apply_mixing(mixing_matrix)
+        else:
+            self._E_per_V_unmixed = None
+            self._set_energy_per_vol({flavor: results[flavor][flavor] for flavor in self.flavors})
 
     @property
     def E_per_V(self):
         """Returns dictionary of photonic energy deposition vs time for each neutrino flavor.
         This property will return None if this Simulation instance has not yet been run.
         """
-        return self._E_per_V if self._E_per_V else None
+        if self._E_per_V is None:
+            return None
+        return {flavor: E_per_V << _E_per_V_unit for flavor, E_per_V in self._E_per_V.items()}
 
     @property
     def total_E_per_V(self):
         """Returns all-flavor photonic energy deposition vs time for each neutrino flavor.
         This property will return None if this Simulation instance has not yet been run.
         """
-        # TODO: Compound statement is redundant, member is None at init and then changed only after running
-        return self._total_E_per_V if self._total_E_per_V else None
+        if self._total_E_per_V is None:
+            return None
+        return self._total_E_per_V << _E_per_V_unit
 
     def avg_dom_signal(self, dt=None, flavor=None):
         """Returns estimated signal in one DOM, computed using avg DOM effective volume
@@ -367,7 +796,7 @@ class Simulation:
             Average signal observed in one DOM as a function of time
         """
         if not dt:
-            dt = self._res_dt
+            dt = self._res_dt * u.s
         self.rebin_result(dt)
 
         if flavor is None:
@@ -375,8 +804,8 @@ class Simulation:
         else:
             E_per_V = self._E_per_V_binned[flavor]
 
-        effvol = 0.1654 * u.m ** 3 / u.MeV  # Simple estimation of IceCube DOM Eff. Vol.
-        return effvol * E_per_V * (self.eps_dc + self.eps_i3)/2
+        effvol = 0.1654  # Simple estimation of IceCube DOM Eff. Vol. in m**3 / MeV
+        return effvol * E_per_V * (self.eps_dc + self.eps_i3)/2 * u.dimensionless_unscaled
 
     def rebin_result(self, dt, *, offset=0 * u.s, force_rebin=False):
         """Rebins the simulation results to a new time binning.
@@ -384,9 +813,11 @@ class Simulation:
         Parameters
         ----------
         dt : astropy.quantity.Quantity
-            New time binning, must be a multiple of the base binning used for the simulation.
+            New time binning. If it is not a multiple of the base binning used for the simulation, the energy
+            deposition is assumed to be uniform within each base bin.
         offset : astropy.quantity.Quantity
-            Offset to apply to rebinned result in units s (or compatible)
+            Offset to apply to rebinned result in units s (or compatible), it need not be a multiple of the base
+            binning used for the simulation.
         force_rebin : bool
             If True, perform the rebin operation, regardless of other circumstances.
             If False, only perform rebin if argument `dt` differs with current binning stored in `self._res_dt`
@@ -394,49 +825,93 @@ class Simulation:
         Returns
         -------
         None
+
+        Notes
+        -----
+        The `rebin_cache_size` most recently used rebinned results (and the corresponding deadtime efficiencies) are
+        cached, keyed by `dt`, `offset` and the progenitor distance. Use `clear_rebin_cache` to release them.
+        Rebinned arrays are read-only.
+        """
+        self._rebin_result(dt.to(u.s).value, offset.to(u.s).value, force_rebin=force_rebin)
+
+    def _rebin_result(self, dt, offset=0., *, force_rebin=False):
+        """Rebins the simulation results to a new time binning, see Simulation.rebin_result
+
+        Each rebinned bin is the difference of the cumulative energy deposition at its edges, so the cost is
+        independent of the ratio of `dt` to the base binning.
+
+        Parameters
+        ----------
+        dt : float
+            New time binning in units s
+        offset : float
+            Offset to apply to rebinned result in units s
+        force_rebin : bool
+            If True, perform the rebin operation, regardless of other circumstances.
         """
         if self._E_per_V is None or self._total_E_per_V is None:
             raise RuntimeError("Simulation has not been executed yet, please use Simulation.run()")
 
-        _dt = dt.to(u.s).value
-        _offset = int(offset.to(u.us).value + 0.5)  # This is a guard against floating point errors
-        is_same_rebin = _dt == self._res_dt.to(u.s).value and _offset == int(self._res_offset.to(u.us).value + 0.5)
+        distance = self.distance.to(u.kpc).value
+        is_same_rebin = dt == self._res_dt and offset == self._res_offset and distance == self._res_distance
         if not is_same_rebin or force_rebin:
-            if _offset != 0:
-                if _offset % int(self._sim_dt.to(u.us).value):
-                    warnings.warn(f"Requested offset ({offset}) is not divisible by simulation binsize "
-                                  f"{self._sim_dt}, offset will not be applied.")
-                    _offset = 0
-                if _offset > self.time[-1].to(u.us).value or _offset < self.time[0].to(u.us).value:
-                    warnings.warn(f"Requested offset ({offset}) will shift signal onset beyond simulation time "
-                                  f"[{self.time[0].to(u.s)}, {self.time[-1].to(u.s)}], offset will not be applied")
-                    _offset = 0
-
             _t = self.time.to(u.s).value
-            rebinfactor = int(_dt / self._sim_dt.to(u.s).value)  # TODO: Check behavior for case _res_dt % _sim_dt != 0
-            offset_bins = int(_offset / self._sim_dt.to(u.us).value)
-
-            self._time_binned = np.array([part[0] for part in _get_partitions(_t, part_size=rebinfactor)]) * u.s
-
-            self._E_per_V_binned = {}
-            self._total_E_per_V_binned = np.zeros_like(self._time_binned.value)
+            if offset != 0 and (offset > _t[-1] or offset < _t[0]):
+                warnings.warn(f"Requested offset ({offset * u.s}) will shift signal onset beyond simulation time "
+                              f"[{_t[0] * u.s}, {_t[-1] * u.s}], offset will not be applied")
+                offset = 0.
+
+            key = (dt, offset, distance)
+            if key in self._rebin_cache and not force_rebin:
+                self._rebin_cache.move_to_end(key)
+                (self._time_binned, self._E_per_V_binned, self._total_E_per_V_binned,
+                 self._eps_i3, self._eps_dc) = self._rebin_cache[key]
+                self._res_dt = dt
+                self._res_offset = offset
+                self._res_distance = distance
+                return
 
             for flavor in self.flavors:
-                E_per_V = np.roll(self._E_per_V[flavor].value, offset_bins)
-                if offset_bins < 0:
-                    E_per_V[offset_bins:] = 0
-                elif offset_bins > 0:
-                    E_per_V[:offset_bins] = 0
-
-                E_per_V_binned = np.array([np.sum(part) for part in _get_partitions(E_per_V, part_size=rebinfactor)])
-                self._E_per_V_binned[flavor] = E_per_V_binned * (u.MeV / u.m / u.m / u.m)
-                self._total_E_per_V_binned += E_per_V_binned
-            self._total_E_per_V_binned *= (u.MeV / u.m / u.m / u.m)
-            self._res_dt = _dt * u.s
-            self._res_offset = _offset * u.us.to(u.s) * u.s
+                if flavor not in self._E_per_V_cumulative:
+                    self._E_per_V_cumulative[flavor] = _cumulative(self._E_per_V[flavor])
+            time_binned, self._E_per_V_binned = _rebin(self._E_per_V, self._E_per_V_cumulative, self._sim_dt,
+                                                       dt, offset)
+            self._time_binned = _t[0] + time_binned
+            self._total_E_per_V_binned = sum(self._E_per_V_binned.values())
+            self._res_dt = dt
+            self._res_offset = offset
+            self._res_distance = distance
             self._eps_i3 = self._compute_deadtime_efficiency(domtype='i3')
             self._eps_dc = self._compute_deadtime_efficiency(domtype='dc')
 
+            # Cached results are shared, so they are made read-only
+            for arr in (self._time_binned, self._total_E_per_V_binned, self._eps_i3, self._eps_dc,
+                        *self._E_per_V_binned.values()):
+                arr.flags.writeable = False
+            self._rebin_cache[key] = (self._time_binned, self._E_per_V_binned, self._total_E_per_V_binned,
+                                      self._eps_i3, self._eps_dc)
+            while len(self._rebin_cache) > self.rebin_cache_size:
+                self._rebin_cache.popitem(last=False)
+
+    def clear_rebin_cache(self):
+        """Removes all rebinned results from the cache of rebinned results, see Simulation.rebin_cache_size"""
+        self._rebin_cache.clear()
+
+    def result(self):
+        """Returns a read-only view of the simulation result at the current distance and time binning
+
+        The view holds a copy of the result, so it is unaffected by later changes to this Simulation, and can be
+        shared between threads. See SimulationResult.
+
+        Returns
+        -------
+        result : SimulationResult
+        """
+        if self._E_per_V is None:
+            raise RuntimeError("Simulation has not been executed yet, please use Simulation.run()")
+        return SimulationResult(self.time, self._E_per_V, self.detector, self.distance, self._res_dt * u.s,
+                                self._res_offset * u.s)
+
     def scale_result(self, distance, force_rescale=False):
         """Rescales the simulation results to a progenitor distance.
 
@@ -462,11 +937,15 @@ class Simulation:
             scaling_factor = (current_dist / new_dist) ** 2
             for flavor in self.flavors:
                 self._E_per_V[flavor] *= scaling_factor
-                self._E_per_V_binned[flavor] *= scaling_factor
+                if flavor in self._E_per_V_cumulative:
+                    self._E_per_V_cumulative[flavor] *= scaling_factor
+                if self._E_per_V_unmixed is not None:
+                    for result in self._E_per_V_unmixed[flavor].values():
+                        result *= scaling_factor
             self._total_E_per_V *= scaling_factor
-            self._total_E_per_V_binned *= scaling_factor
-            self.rebin_result(dt=self._res_dt, offset=self._res_offset, force_rebin=True)
+            # Rebinned results are cached by distance, so the distance is updated first
             self.distance = new_dist * u.kpc
+            self._rebin_result(self._res_dt, self._res_offset, force_rebin=force_rescale)
 
     def _compute_deadtime_efficiency(self, domtype='i3', *, dom_effvol=None):
         """Compute DOM deadtime efficiency factor (arises from 250 us artificial deadtime).
@@ -499,20 +978,7 @@ class Simulation:
             else:
                 raise ValueError(f"Unknown domtype: {domtype}, expected ('i3', 'dc')")
 
-        if isinstance(dom_effvol, np.ndarray):
-            # Ensures proper np broadcasting
-            dom_signal = self.total_E_per_V_binned.value.reshape(-1, 1) * dom_effvol.reshape(1, -1)
-        else:
-            # In SNDAQ this is calculated **with** poisson randomness
-            dom_signal = dom_effvol * self.total_E_per_V_binned.value
-
-        # TODO: Adjust this scaling based on the determined "proper" method for computing deadtime
-        #   eps_dt = 0.87 / (1+ 250us * true_sn_rate) -- is true_sn_rate the rate in 500ms bins, 1s bins, etc?
-        #   SNDAQ always uses 500ms
-        # Convert scaling factor as if it is a 0.5s bin
-        scaling_factor = 0.5/self._res_dt.to(u.s).value
-        dom_signal *= scaling_factor
-        return 0.87 / (1 + self.detector.deadtime * dom_signal)
+        return _deadtime_efficiency(self._total_E_per_V_binned, dom_effvol, self._res_dt, self.detector.deadtime)
 
     @property
     def eps_i3(self):
@@ -527,17 +993,23 @@ class Simulation:
     @property
     def total_E_per_V_binned(self):
         """All-flavor photonic energy deposition in result time binning"""
-        return self._total_E_per_V_binned
+        if self._total_E_per_V_binned is None:
+            return None
+        return self._total_E_per_V_binned << _E_per_V_unit
 
     @property
     def E_per_V_binned(self):
         """Flavor-keyed dictionary of photonic energy deposition in result time binning"""
-        return self._E_per_V_binned
+        if self._E_per_V_binned is None:
+            return None
+        return {flavor: E_per_V << _E_per_V_unit for flavor, E_per_V in self._E_per_V_binned.items()}
 
     @property
     def time_binned(self):
         """Leading bin edges of in result time binning"""
-        return self._time_binned
+        if self._time_binned is None:
+            return None
+        return self._time_binned << u.s
 
     def detector_signal(self, dt=None, flavor=None, subdetector=None, offset=0*u.s):
         """Compute signal rates observed by detector
@@ -566,11 +1038,11 @@ class Simulation:
 
         i3_total_effvol = self.detector.i3_total_effvol if subdetector != 'dc' else 0
         dc_total_effvol = self.detector.dc_total_effvol if subdetector != 'i3' else 0
-        E_per_V = self.total_E_per_V_binned.value if flavor is None else self.E_per_V_binned[flavor].value
+        E_per_V = self._total_E_per_V_binned if flavor is None else self._E_per_V_binned[flavor]
 
         return self.time_binned, E_per_V * (i3_total_effvol * self.eps_i3 + dc_total_effvol * self.eps_dc)
 
-    def detector_hits(self, dt=0.5*u.ms, flavor=None, subdetector=None, offset=0*u.s):
+    def detector_hits(self, dt=0.5*u.ms, flavor=None, subdetector=None, offset=0*u.s, *, rng=None):
         """Compute hit rates observed by detector
 
         Parameters
@@ -581,6 +1053,8 @@ class Simulation:
             Flavor for which to report signal, if None is provided, all-flavor signal is reported
         subdetector: None or str
             IceCube subdetector, must be None (Full Detector), 'i3' (IC80) or 'dc' (DeepCore)
+        rng : numpy.random.Generator or None, optional
+            Random number generator, if None the global numpy random state is used
 
         Returns
         -------
@@ -590,10 +1064,12 @@ class Simulation:
         time_binned, signal = self.detector_signal(dt, flavor, subdetector, offset)
         # return time_binned, np.random.poisson(signal)
 
-        return time_binned, np.random.normal(signal, np.sqrt(signal))
+        rng = np.random if rng is None else rng
+        return time_binned, rng.normal(signal, np.sqrt(signal))
 
     def sample_significance(self, sample_size=1, dt=0.5*u.s, distance=10*u.kpc, offset=None, binnings=None,
-                            use_random_offset=True, *, only_highest=True, debug_info=False, seeds=None):
+                            use_random_offset=True, *, only_highest=True, debug_info=False, seeds=None, seed=None,
+                            workers=None, executor=None, chunk_size=1000):
         """Simulate and collects a sample of SNDAQ trigger, "significance", test statistics
 
         Parameters
@@ -619,9 +1095,20 @@ class Simulation:
             If True, sample only the highest significance triggers across the binsizes in `binnings`
             If False, sample the trigger significances for each binsize in `binnings`
         debug_info : bool
-            If True, return the offsets and seeds used during the simulation
+            If True, return the offsets and seed sequence used during the simulation
         seeds : np.ndarray or None, optional
-            Seeds used to obtain realizations of background rates
+            Deprecated, use `seed`. If provided, the seeds are used as the entropy of the root seed sequence.
+        seed : int, numpy.random.SeedSequence or None, optional
+            Seed of the root seed sequence of the sample. Trial i draws its random offset, hits and background
+            from a numpy.random.Generator seeded by the i-th child spawned from the root seed sequence.
+            If None, the root seed sequence is seeded with fresh entropy from the OS.
+        workers : int or None, optional
+            Number of worker processes used to simulate the trials in parallel.
+            If None (and no `executor` is provided), trials are simulated serially in this process.
+        executor : concurrent.futures.Executor or None, optional
+            Executor used to simulate the trials, takes precedence over `workers`.
+        chunk_size : int, optional
+            Number of trials simulated together, trials are simulated as 2D arrays of shape (chunk_size, n_bins)
 
         Returns
         -------
@@ -629,8 +1116,8 @@ class Simulation:
             Sample of simulated SN trigger significances.
         offsets : astropy.units.Quantity, optional
             Random time offsets on neutrino signal onset used during simulation (Only returned when `debug_info=True`)
-        seeds : np.ndarray, optional
-            Random seeds used to create background rate realizations (Only returned when `debug_info=True`)
+        seed_sequence : numpy.random.SeedSequence, optional
+            Root seed sequence of the sample (Only returned when `debug_info=True`)
 
         See Also
         --------
@@ -641,32 +1128,190 @@ class Simulation:
         The `offset` and `use_random_offset` arguments are motivated by uncertainty on timing og the signal
         onset as it arrives relative to the bin edges used by SNDAQ to form triggers.
         The signal lightcurve onset will align with a bin edge for the case `offset=0*u.s, use_random_offset=False`
+
+        Trials are simulated in batches from a view of the simulation result at `distance` (see Simulation.result),
+        so the simulation itself is not rescaled. As each trial uses its own random stream, a sample is
+        reproducible from its seed and is identical for any number of workers.
         """
-        self.scale_result(distance)
+        if executor is None and workers is not None and workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return self.sample_significance(sample_size, dt, distance, offset, binnings, use_random_offset,
+                                                only_highest=only_highest, debug_info=debug_info, seeds=seeds,
+                                                seed=seed, executor=executor, chunk_size=chunk_size)
+
+        if seeds is not None:
+            warnings.warn('Argument `seeds` is deprecated, use `seed` instead.', DeprecationWarning)
+            seed = [int(_seed) for _seed in seeds]
+        seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        binnings = [0.5, 1.5, 4, 10] * u.s if binnings is None else binnings
 
         if use_random_offset:
-            offsets = np.random.randint(0, 500, size=sample_size) * u.ms
-            seeds = os.urandom(sample_size)  # Sets random seed for realization of background in signi calc
+            offsets = None
         elif isinstance(offset, u.Quantity):
-            if offset.size == 1:
-                offsets = offset.to(u.s).value * np.ones(sample_size) * u.s
-            else:
-                offsets = offset
+            offsets = offset.to(u.s).value * np.ones(sample_size)
         else:
-            offsets = np.zeros(sample_size) * u.s
+            offsets = np.zeros(sample_size)
 
-        if seeds is None:
-            seeds = [None] * sample_size
+        result = self.result().at_distance(distance)
+        _dt = dt.to(u.s).value
+        rebin_factors = [int(binsize / _dt) for binsize in binnings.to(u.s).value]
+        args = [(result, _dt, rebin_factors, seed_sequence, start, min(start + chunk_size, sample_size),
+                 None if offsets is None else offsets[start:start + chunk_size])
+                for start in range(0, sample_size, chunk_size)]
+        if executor is not None:
+            batches = list(executor.map(_sample_trials, *zip(*args)))
+        else:
+            batches = [_sample_trials(*_args) for _args in args]
+        sample = np.concatenate([xi for xi, _ in batches])
 
-        sample = np.array([self.trigger_significance(dt=dt, offset=_offset, binnings=binnings, seed=seed)
-                           for _offset, seed in zip(offsets, seeds)])
         if only_highest:
             sample = sample.max(axis=1)
         if debug_info:
-            return sample, offsets, seeds
+            return sample, np.concatenate([_offsets for _, _offsets in batches]) * u.s, seed_sequence
         return sample
 
-    def trigger_significance(self, dt=0.5*u.s, binnings=[0.5, 1.5, 4, 10]*u.s, offset=0*u.s, *, seed=None):
+    def expected_significance(self, distance=10*u.kpc, dt=0.5*u.s, offset=None, binnings=None,
+                              use_random_offset=True, *, only_highest=True, n_offsets=20):
+        """Computes the expected SNDAQ trigger significance and its spread, without MC trials
+
+        Parameters
+        ----------
+        distance : astropy.units.Quantity
+            Distance(s) to SN progenitor, a scalar or an array.
+        dt : astropy.units.Quantity
+            Size of smallest binning of neutrino lightcurve used in simulation.
+        offset : astropy.units.Quantity or None, default = 0 * astropy.units.s
+            Time shift applied to neutrino lightcurve (positive shifts lightcurve later).
+        binnings : astropy.units.Quantity or None, default = [0.5, 1.5, 4., 10.] * astropy.units.s
+            Size of time binnings at which to calculate trigger test statistic
+        use_random_offset : bool, optional
+            If True, average over time offsets uniformly distributed in the range (0, 500ms), as applied to the
+                trials of sample_significance. This will override the value of argument `offset`.
+            If False, use argument `offset`
+        only_highest : bool, optional
+            If True, return the significance of the binsize with the highest expected significance
+            If False, return the significances for each binsize in `binnings`
+        n_offsets : int, optional
+            Number of evenly spaced offsets over which the significance is averaged if `use_random_offset` is True
+
+        Returns
+        -------
+        xi_mean : np.ndarray
+            Expected significances, with shape distance.shape (+ (binnings.size,) if `only_highest` is False)
+        xi_std : np.ndarray
+            Standard deviations of the significances, with the shape of `xi_mean`
+
+        See Also
+        --------
+        asteria.simulation.Simulation.sample_significance
+        asteria.trigger.expected_significance
+
+        Notes
+        -----
+        For each distance and offset, the signal (including the deadtime efficiency) is computed from a single rebin
+        of the simulation result, and the significance is computed from the expected hits and background (the
+        Asimov significance), with a spread from the variance of the hits and the Gaussian background model. For
+        random offsets, the mean and variance are those of the mixture over offsets.
+        The expected significance agrees with the mean of sample_significance when the signal is well above
+        background (xi of a few or more), see asteria.trigger.expected_significance.
+        """
+        binnings = [0.5, 1.5, 4, 10] * u.s if binnings is None else binnings
+        if use_random_offset:
+            offsets = (np.arange(n_offsets) + 0.5) * 0.5 / n_offsets
+        else:
+            offsets = np.atleast_1d(0. if offset is None else offset.to(u.s).value)
+
+        result = self.result()
+        _dt = dt.to(u.s).value
+        rebin_factors = [int(binsize / _dt) for binsize in binnings.to(u.s).value]
+        # Signal without deadtime scales as 1 / distance**2, the deadtime efficiency is computed at each distance
+        scale = (result.distance.to(u.kpc).value / distance.to(u.kpc).value) ** 2
+        total = np.multiply.outer(scale, result._offset_total(_dt, offsets))
+        xi_mean, xi_std, _ = expected_significance(*_detector_signals(total, self.detector, _dt), _dt,
+                                                   rebin_factors, self.detector)
+        if only_highest:
+            idx = xi_mean.argmax(axis=-1)[..., np.newaxis]
+            xi_mean = np.take_along_axis(xi_mean, idx, axis=-1)
+            xi_std = np.take_along_axis(xi_std, idx, axis=-1)
+
+        # Mixture over offsets
+        xi_var = (xi_std ** 2).mean(axis=-2) + xi_mean.var(axis=-2)
+        xi_mean = xi_mean.mean(axis=-2)
+        if only_highest:
+            return xi_mean[..., 0], np.sqrt(xi_var[..., 0])
+        return xi_mean, np.sqrt(xi_var)
+
+    def detection_curve(self, distances, threshold=6., n_trials=1000, dt=0.5*u.s, binnings=None, *, seed=None,
+                        workers=None, executor=None, chunk_size=None):
+        """Simulate the probability of an SNDAQ trigger as a function of progenitor distance
+
+        Parameters
+        ----------
+        distances : astropy.units.Quantity
+            Distances to SN progenitor
+        threshold : float, optional
+            Threshold on the highest SNDAQ trigger significance across `binnings`
+        n_trials : int, optional
+            Number of trials simulated at each distance
+        dt : astropy.units.Quantity
+            Size of smallest binning of neutrino lightcurve used in simulation.
+        binnings : astropy.units.Quantity or None, default = [0.5, 1.5, 4., 10.] * astropy.units.s
+            Size of time binnings at which to calculate trigger test statistic
+        seed : int, numpy.random.SeedSequence or None, optional
+            Seed of the root seed sequence of the trials, see Simulation.sample_significance
+        workers : int or None, optional
+            Number of worker processes used to simulate the trials in parallel.
+            If None (and no `executor` is provided), trials are simulated serially in this process.
+        executor : concurrent.futures.Executor or None, optional
+            Executor used to simulate the trials, takes precedence over `workers`.
+        chunk_size : int or None, optional
+            Number of trials simulated together, trials are simulated as 3D arrays of shape
+            (distances.size, chunk_size, n_bins). If None, it is chosen to hold about 10**6 bins.
+
+        Returns
+        -------
+        probability : np.ndarray
+            Fraction of trials with a significance at or above `threshold`, with shape distances.shape. Its binomial
+            standard error is sqrt(probability * (1 - probability) / n_trials).
+
+        See Also
+        --------
+        asteria.simulation.Simulation.sample_significance
+        asteria.horizon.detection_horizon
+
+        Notes
+        -----
+        Trials use random signal offsets in the range (0, 500ms), and each trial's offset, hits and background
+        fluctuations are drawn once and used at all distances. The lightcurve is rebinned once per trial, and the
+        signal at each distance is rescaled as 1 / distance**2 with the deadtime efficiency at that distance, so
+        the simulation itself is not rescaled. The trials at each distance are those of sample_significance with the
+        same `seed`.
+        """
+        if executor is None and workers is not None and workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return self.detection_curve(distances, threshold, n_trials, dt, binnings, seed=seed,
+                                            executor=executor, chunk_size=chunk_size)
+
+        seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        binnings = [0.5, 1.5, 4, 10] * u.s if binnings is None else binnings
+        _dt = dt.to(u.s).value
+        rebin_factors = [int(binsize / _dt) for binsize in binnings.to(u.s).value]
+        _distances = distances.to(u.kpc).value.ravel()
+        result = self.result()
+        if chunk_size is None:
+            n_bins = ceil(self.time.size * self._sim_dt / _dt)
+            chunk_size = max(1, min(n_trials, 10 ** 6 // (_distances.size * n_bins)))
+
+        args = [(result, _dt, rebin_factors, threshold, _distances, seed_sequence, start,
+                 min(start + chunk_size, n_trials)) for start in range(0, n_trials, chunk_size)]
+        if executor is not None:
+            n_detected = sum(executor.map(_trial_detections, *zip(*args)))
+        else:
+            n_detected = sum(_trial_detections(*_args) for _args in args)
+        return (n_detected / n_trials).reshape(distances.shape)
+
+    def trigger_significance(self, dt=0.5*u.s, binnings=[0.5, 1.5, 4, 10]*u.s, offset=0*u.s, *, seed=None,
+                             debug_info=False):
         """Simulates one SNDAQ trigger "significance" test statistic for requested binnings
 
         Parameters
@@ -680,13 +1325,23 @@ class Simulation:
         binnings : astropy.units.Quantity or None, default = [0.5, 1.5, 4., 10.] * astropy.units.s
             Size of time binnings at which to calculate trigger test statistic
             Unexpected behaviors may arise if the binnings are not cleanly divisible by argument `dt`
-        seed : np.ndarray, optional
-            Random seed used to create background rate realizations
+        seed : int, numpy.random.SeedSequence, numpy.random.Generator or None, optional
+            Seed of the random number generator used for the hits and background rate realizations, see
+            numpy.random.default_rng. If None, the global numpy random state is used.
+        debug_info : bool, optional
+            If True, return the significance in every search window and the window with the highest significance
 
         Returns
         -------
         xi : np.ndarray
             SNDAQ trigger significances corresponding to `binnings`
+        xi_windows : list of np.ndarray, optional
+            Significances in each search window for each binning, with shape (n_offsets, n_bins). Window j at offset
+            k is the j-th bin of the binning with the signal shifted later by k * `dt` (Only returned when
+            `debug_info=True`)
+        idx_max : np.ndarray, optional
+            Offset and bin indices (k, j) of the window with the highest significance for each binning, with shape
+            (binnings.size, 2) (Only returned when `debug_info=True`)
 
         Notes
         -----
@@ -699,78 +1354,706 @@ class Simulation:
             1 - Obtain a realization of IceCube's background Rate the base time binning `dt`
             2 - Rebin the background and signal rates to the search windows from `binnings`
             3 - Shift signal forward in increments of dt to mimic offset searches of SNDAQ (first iter has no offset)
-            4 - Compute significance xi using max. LLH from arXiv:1108.0171
-            5 - Compare current offset's significances to prior results, if a higher significance is found in the same
-                binning overwrite that binning's prior result.
-            6 - Repeat 3--5 for all offsets as appropriate for binning
-            7 - Repeat 2--5 for all binnings in `binnings`
-
-        """
-        _, hits_i3 = self.detector_hits(dt=dt, offset=offset, subdetector='i3')
-        _, hits_dc = self.detector_hits(dt=dt, offset=offset, subdetector='dc')
-        xi = np.zeros(binnings.size)
-
-        for idx_bin, binsize in enumerate(binnings):
-            if seed is not None:
-                np.random.seed(seed)
-
-            rebin_factor = int(binsize.to(u.s).value / dt.to(u.s).value)
-            n_bins = ceil(hits_i3.size/rebin_factor)
-
-            bg_i3 = self.detector.i3_bg(dt=dt, size=hits_i3.size)
-            bg_dc = self.detector.dc_bg(dt=dt, size=hits_i3.size)
-
-            # Create a realization of background rate scaled up from dt to binsize
-            bg_i3_binned = np.zeros(n_bins)
-            bg_dc_binned = np.zeros(n_bins)
-            for idx_time, (bg_i3_part, bg_dc_part) in enumerate(_get_partitions(bg_i3, bg_dc, part_size=rebin_factor)):
-                bg_i3_binned[idx_time] = np.sum(bg_i3_part)
-                bg_dc_binned[idx_time] = np.sum(bg_dc_part)
-
-            # Compute *DOM* background rate variance
-            # Background variance is not well estimated after the rebin, so use lower binning and upscale
-            # This could be mitigated by extending background windows, at the cost of speed
-            bg_i3_var_dom = rebin_factor * self.detector.i3_dom_bg(dt=dt, size=1000).var()
-            bg_dc_var_dom = rebin_factor * self.detector.dc_dom_bg(dt=dt, size=1000).var()
-
-            # If hits_i3.size / rebin_factor is not an integer, then the last bin in the rebinned rates will be partial
-            # In this case, exclude it from the calculation of the background mean
-            if bg_i3.size % rebin_factor != 0:
-                idx_bg = bg_i3_binned.size - 1
-            else:
-                idx_bg = bg_i3_binned.size
-
-            bg_i3_mean = bg_i3_binned[:idx_bg].mean()  # IC80 *subdetector* rate mean
-            bg_dc_mean = bg_dc_binned[:idx_bg].mean()  # DeepCore *subdetector* rate mean
-
-            # Compute xi with increments of 0.5s offsets, mimicking the offset searches of SNDAQ
-            for idx_offset in range(rebin_factor):
-                hits_i3_offset = np.roll(hits_i3, idx_offset)
-                hits_dc_offset = np.roll(hits_dc, idx_offset)
-                hits_i3_offset[:idx_offset] = 0
-                hits_dc_offset[:idx_offset] = 0
-                hits_i3_binned = np.zeros(n_bins)
-                hits_dc_binned = np.zeros(n_bins)
-
-                for idx_time, (hits_i3_part, hits_dc_part) in enumerate(_get_partitions(hits_i3_offset, hits_dc_offset,
-                                                                                        part_size=rebin_factor)):
-                    hits_i3_binned[idx_time] = np.sum(hits_i3_part)
-                    hits_dc_binned[idx_time] = np.sum(hits_dc_part)
-
-                var_dmu = 1/((self.detector.n_i3_doms/bg_i3_var_dom) +
-                             (self.detector.n_dc_doms*self.detector.dc_rel_eff**2/bg_dc_var_dom))
-                dmu = var_dmu * (
-                        ((hits_i3_binned + bg_i3_binned - bg_i3_mean) / bg_i3_var_dom) +
-                        ((hits_dc_binned + bg_dc_binned - bg_dc_mean) / bg_dc_var_dom))
-                # Should rel. eff be considered here? It would have already been considered once during hit generation
-                # It's unclear if SNDAQ applies this same factor, it does apply *a* factor that is somehow normalized
-                #        ((hits_dc_binned + bg_dc_binned - bg_dc_mean) * self.detector.dc_rel_eff / bg_dc_var_dom))
-                _xi = dmu/np.sqrt(var_dmu)
-
-                xi[idx_bin] = np.max([xi[idx_bin], _xi.max()])
+            4 - Compute significance xi using max. LLH from arXiv:1108.0171, with the analytic DOM background variance
+            5 - Take the highest significance over all offsets and windows of each binning
+        One background realization is shared by all binnings, and the search windows of all binnings and offsets
+        are computed from cumulative sums, see asteria.trigger.significance
+
+        """
+        rng = np.random if seed is None else np.random.default_rng(seed)
+        _, hits_i3 = self.detector_hits(dt=dt, offset=offset, subdetector='i3', rng=rng)
+        _, hits_dc = self.detector_hits(dt=dt, offset=offset, subdetector='dc', rng=rng)
+        bg_i3 = self.detector.i3_bg(dt=dt, size=hits_i3.size, rng=rng)
+        bg_dc = self.detector.dc_bg(dt=dt, size=hits_i3.size, rng=rng)
+
+        _dt = dt.to(u.s).value
+        rebin_factors = [int(binsize / _dt) for binsize in binnings.to(u.s).value]
+        xi, idx_max = max_significance(hits_i3, hits_dc, bg_i3, bg_dc, _dt, rebin_factors, self.detector)
+        xi = np.maximum(xi, 0)
+        if debug_info:
+            xi_windows = significance(hits_i3, hits_dc, bg_i3, bg_dc, _dt, rebin_factors, self.detector)
+            return xi, xi_windows, idx_max
         return xi
 
 
+class SimulationResult:
+    """Read-only view of the results of a Simulation at one progenitor distance and time binning
+
+    Views are created by Simulation.result, and methods of a view return new views rather than modifying it, so a
+    view can be shared between threads. Views share the arrays of the simulation result they were created from,
+    which are read-only.
+    """
+    def __init__(self, time, E_per_V, detector, distance, dt, offset=0 * u.s):
+        """
+        Parameters
+        ----------
+        time : astropy.quantity.Quantity
+            Leading edges of the uniform time bins of the simulation
+        E_per_V : dict
+            Flavor-keyed energy deposition in MeV / m**3 (but not stored with astropy units), in bins of `time`.
+            Arrays are copied.
+        detector : asteria.detector.Detector
+            Detector used to compute the signal and hits
+        distance : astropy.quantity.Quantity
+            Progenitor distance of `E_per_V`
+        dt : astropy.quantity.Quantity
+            Time binning of the view
+        offset : astropy.quantity.Quantity
+            Offset applied to the signal in the time binning of the view
+        """
+        self._time = _read_only(np.array(time.to(u.s).value))
+        self._sim_dt = self._time[1] - self._time[0]
+        self._E_per_V = {flavor: _read_only(np.array(result, dtype=float)) for flavor, result in E_per_V.items()}
+        self._cumulative = {flavor: _read_only(_cumulative(result)) for flavor, result in self._E_per_V.items()}
+        self._base_distance = distance.to(u.kpc).value
+        self._scale = 1.
+        self.detector = detector
+        self._rebin(dt.to(u.s).value, offset.to(u.s).value)
+
+    def _rebin(self, dt, offset):
+        """Computes the binned arrays of this view, only called while the view is created"""
+        time_binned, E_per_V_binned = _rebin(self._E_per_V, self._cumulative, self._sim_dt, dt, offset)
+        self._dt = dt
+        self._offset = offset
+        self._time_binned = _read_only(self._time[0] + time_binned)
+        self._E_per_V_binned = {flavor: _read_only(self._scale * result) for flavor, result in E_per_V_binned.items()}
+        self._total_E_per_V_binned = _read_only(sum(self._E_per_V_binned.values()))
+        self._eps_i3 = _read_only(_deadtime_efficiency(self._total_E_per_V_binned, self.detector.i3_dom_effvol,
+                                                       dt, self.detector.deadtime))
+        self._eps_dc = _read_only(_deadtime_efficiency(self._total_E_per_V_binned, self.detector.dc_dom_effvol,
+                                                       dt, self.detector.deadtime))
+
+    def _view(self, distance, dt, offset):
+        """Returns a new view of the same simulation result, with distance in kpc and dt, offset in s"""
+        view = object.__new__(SimulationResult)
+        view.__dict__.update({key: self.__dict__[key] for key in ('_time', '_sim_dt', '_E_per_V', '_cumulative',
+                                                                  '_base_distance', 'detector')})
+        view._scale = (self._base_distance / distance) ** 2
+        view._rebin(dt, offset)
+        return view
+
+    def at_distance(self, distance):
+        """Returns a view of this result at another progenitor distance
+
+        Parameters
+        ----------
+        distance : astropy.quantity.Quantity
+            Progenitor distance
+
+        Returns
+        -------
+        result : SimulationResult
+        """
+        return self._view(distance.to(u.kpc).value, self._dt, self._offset)
+
+    def rebinned(self, dt, offset=0 * u.s):
+        """Returns a view of this result in another time binning, see Simulation.rebin_result
+
+        Parameters
+        ----------
+        dt : astropy.quantity.Quantity
+            Time binning
+        offset : astropy.quantity.Quantity
+            Offset applied to the signal (positive shifts the signal later)
+
+        Returns
+        -------
+        result : SimulationResult
+        """
+        return self._view(self.distance.to(u.kpc).value, dt.to(u.s).value, offset.to(u.s).value)
+
+    @property
+    def distance(self):
+        """Progenitor distance"""
+        return self._base_distance / np.sqrt(self._scale) * u.kpc
+
+    @property
+    def dt(self):
+        """Time binning"""
+        return self._dt * u.s
+
+    @property
+    def offset(self):
+        """Offset applied to the signal"""
+        return self._offset * u.s
+
+    @property
+    def time(self):
+        """Leading edges of the time bins of the simulation"""
+        return self._time << u.s
+
+    @property
+    def E_per_V(self):
+        """Flavor-keyed dictionary of photonic energy deposition in the time bins of the simulation"""
+        return {flavor: (self._scale * result) << _E_per_V_unit for flavor, result in self._E_per_V.items()}
+
+    @property
+    def total_E_per_V(self):
+        """All-flavor photonic energy deposition in the time bins of the simulation"""
+        return (self._scale * sum(self._E_per_V.values())) << _E_per_V_unit
+
+    @property
+    def time_binned(self):
+        """Leading edges of the time bins of this view"""
+        return self._time_binned << u.s
+
+    @property
+    def E_per_V_binned(self):
+        """Flavor-keyed dictionary of photonic energy deposition in the time bins of this view"""
+        return {flavor: result << _E_per_V_unit for flavor, result in self._E_per_V_binned.items()}
+
+    @property
+    def total_E_per_V_binned(self):
+        """All-flavor photonic energy deposition in the time bins of this view"""
+        return self._total_E_per_V_binned << _E_per_V_unit
+
+    @property
+    def eps_i3(self):
+        """Deadtime efficiency for IC80 DOMs"""
+        return self._eps_i3
+
+    @property
+    def eps_dc(self):
+        """Deadtime efficiency for DeepCore DOMs"""
+        return self._eps_dc
+
+    def signal(self, flavor=None, subdetector=None):
+        """Returns the signal observed by the detector in the time bins of this view, see Simulation.detector_signal
+
+        Parameters
+        ----------
+        flavor: snewpy.neutrino.Flavor
+            Flavor for which to report signal, if None is provided, all-flavor signal is reported
+        subdetector : None or str
+            IceCube subdetector volume to use for effective volume. 'i3' for IC80, 'dc' for DeepCore, None for IC86
+
+        Returns
+        -------
+        time_binned : astropy.quantity.Quantity
+            Leading edges of the time bins
+        signal : numpy.ndarray
+            Signal observed by the IceCube detector (or subdetector)
+        """
+        i3_total_effvol = self.detector.i3_total_effvol if subdetector != 'dc' else 0
+        dc_total_effvol = self.detector.dc_total_effvol if subdetector != 'i3' else 0
+        E_per_V = self._total_E_per_V_binned if flavor is None else self._E_per_V_binned[flavor]
+        return self.time_binned, E_per_V * (i3_total_effvol * self._eps_i3 + dc_total_effvol * self._eps_dc)
+
+    def hits(self, flavor=None, subdetector=None, *, rng=None):
+        """Returns a realization of the hits observed by the detector, see Simulation.detector_hits
+
+        Parameters
+        ----------
+        flavor: snewpy.neutrino.Flavor
+            Flavor for which to report signal, if None is provided, all-flavor signal is reported
+        subdetector: None or str
+            IceCube subdetector, must be None (Full Detector), 'i3' (IC80) or 'dc' (DeepCore)
+        rng : numpy.random.Generator or None, optional
+            Random number generator, if None the global numpy random state is used
+
+        Returns
+        -------
+        time_binned : astropy.quantity.Quantity
+            Leading edges of the time bins
+        hits : np.ndarray
+            Hits observed by the IceCube detector (or subdetector) as a function of time
+        """
+        time_binned, signal = self.signal(flavor, subdetector)
+        rng = np.random if rng is None else rng
+        return time_binned, rng.normal(signal, np.sqrt(signal))
+
+    def _offset_total(self, dt, offsets):
+        """Returns the all-flavor energy deposition in bins of size `dt` for each of `offsets` (both in units s), with
+        shape (offsets.size, n_bins)"""
+        total = sum(self._E_per_V.values())
+        _, binned = _rebin({None: total}, {None: _cumulative(total)}, self._sim_dt, dt, offsets.reshape(-1, 1))
+        return self._scale * binned[None]
+
+    def _offset_signals(self, dt, offsets):
+        """Returns the IC80 and DeepCore signal in bins of size `dt` for each of `offsets` (both in units s)
+
+        Returns
+        -------
+        signal_i3, signal_dc : np.ndarray
+            Signals with shape (offsets.size, n_bins)
+        """
+        return _detector_signals(self._offset_total(dt, offsets), self.detector, dt)
+
+
+def _detector_signals(total_E_per_V_binned, detector, dt):
+    """Returns the IC80 and DeepCore signal of all-flavor energy deposition in bins of size `dt` (in units s), see
+    Simulation.detector_signal"""
+    eps_i3 = _deadtime_efficiency(total_E_per_V_binned, detector.i3_dom_effvol, dt, detector.deadtime)
+    eps_dc = _deadtime_efficiency(total_E_per_V_binned, detector.dc_dom_effvol, dt, detector.deadtime)
+    return (total_E_per_V_binned * detector.i3_total_effvol * eps_i3,
+            total_E_per_V_binned * detector.dc_total_effvol * eps_dc)
+
+
+def _sample_trials(result, dt, rebin_factors, seed_sequence, start, stop, offsets=None):
+    """Simulates SNDAQ trigger significances for a batch of trials, see Simulation.sample_significance
+
+    Each trial draws its random numbers from its own stream, spawned from `seed_sequence`, so the result of a trial
+    does not depend on the batch it is simulated in.
+
+    Parameters
+    ----------
+    result : SimulationResult
+        Simulation result at the progenitor distance of the trials
+    dt : float
+        Base time binning in units s
+    rebin_factors : list of int
+        Search window sizes in units of `dt`
+    seed_sequence : numpy.random.SeedSequence
+        Root seed sequence of the sample, trial i uses the stream of its i-th spawned child
+    start, stop : int
+        Indices of the first and last (excluded) trial of the batch
+    offsets : np.ndarray or None, optional
+        Offset applied to the signal of each trial in units s. If None, each trial draws a random offset from the
+        range (0, 500ms) in steps of 1 ms.
+
+    Returns
+    -------
+    xi : np.ndarray
+        Significances with shape (stop - start, len(rebin_factors))
+    offsets : np.ndarray
+        Offset applied to the signal of each trial in units s
+    """
+    total, normal, offsets = _draw_trials(result, dt, seed_sequence, start, stop, offsets)
+    return _trial_significance(total, normal, result.detector, dt, rebin_factors), offsets
+
+
+def _draw_trials(result, dt, seed_sequence, start, stop, offsets=None):
+    """Draws the random offsets and normal deviates of a batch of trials, see _sample_trials
+
+    Returns
+    -------
+    total : np.ndarray
+        All-flavor energy deposition of each trial in bins of size `dt`, at the distance of `result`
+    normal : np.ndarray
+        Normal deviates of each trial, for the IC80 and DeepCore hits and background in each bin
+    offsets : np.ndarray
+        Offset applied to the signal of each trial in units s
+    """
+    # Equivalent to seed_sequence.spawn(stop)[start:stop], without spawning the children of other batches
+    rngs = [np.random.default_rng(np.random.SeedSequence(seed_sequence.entropy,
+                                                         spawn_key=seed_sequence.spawn_key + (idx,),
+                                                         pool_size=seed_sequence.pool_size))
+            for idx in range(start, stop)]
+    if offsets is None:
+        offsets = 1e-3 * np.array([rng.integers(0, 500) for rng in rngs], dtype=float)
+    total = result._offset_total(dt, offsets)
+
+    # All normal deviates of a trial are drawn from its stream at once: IC80 and DeepCore hits, then background
+    normal = np.empty((len(rngs), 4 * total.shape[-1]))
+    for rng, _normal in zip(rngs, normal):
+        rng.standard_normal(out=_normal)
+    return total, normal, offsets
+
+
+def _trial_significance(total, normal, detector, dt, rebin_factors):
+    """Returns the significances of trials drawn by _draw_trials, with shape (*total.shape[:-1], len(rebin_factors))
+
+    Leading axes of `total` (e.g. distances) are broadcast against the trials of `normal`.
+    """
+    signal_i3, signal_dc = _detector_signals(total, detector, dt)
+    size = signal_i3.shape[-1]
+    hits_i3 = signal_i3 + np.sqrt(signal_i3) * normal[:, :size]
+    hits_dc = signal_dc + np.sqrt(signal_dc) * normal[:, size:2 * size]
+    bg_i3 = np.broadcast_to(detector.i3_dom_bg_mu * dt * detector.n_i3_doms +
+                            detector.i3_dom_bg_sig * np.sqrt(dt * detector.n_i3_doms) * normal[:, 2 * size:3 * size],
+                            hits_i3.shape)
+    bg_dc = np.broadcast_to(detector.dc_dom_bg_mu * dt * detector.n_dc_doms +
+                            detector.dc_dom_bg_sig * np.sqrt(dt * detector.n_dc_doms) * normal[:, 3 * size:],
+                            hits_dc.shape)
+
+    xi, _ = max_significance(hits_i3, hits_dc, bg_i3, bg_dc, dt, rebin_factors, detector)
+    return np.maximum(xi, 0)
+
+
+def _trial_detections(result, dt, rebin_factors, threshold, distances, seed_sequence, start, stop):
+    """Returns the number of trials of a batch detected at each distance, see Simulation.detection_curve
+
+    Trials are drawn as in _sample_trials, and each trial is evaluated at all distances: its signal is rescaled
+    from `result` as 1 / distance**2 with the deadtime efficiency at each distance, along a leading distance axis.
+
+    Parameters
+    ----------
+    result, dt, rebin_factors, seed_sequence, start, stop
+        See _sample_trials
+    threshold : float
+        Threshold on the highest significance across binnings
+    distances : np.ndarray
+        Distances in units kpc, a 1D array
+
+    Returns
+    -------
+    n_detected : np.ndarray
+        Number of trials with a significance at or above `threshold` at each distance
+    """
+    total, normal, _ = _draw_trials(result, dt, seed_sequence, start, stop)
+    scale = (result.distance.to(u.kpc).value / distances) ** 2
+    xi = _trial_significance(scale.reshape(-1, 1, 1) * total, normal, result.detector, dt, rebin_factors)
+    return (xi.max(axis=-1) >= threshold).sum(axis=-1)
+
+
+def _trial_horizons(result, dt, rebin_factors, threshold, seed_sequence, start, stop, bracket, rtol):
+    """Returns the distance at which the highest significance of each trial of a batch reaches `threshold`
+
+    Trials are drawn as in _sample_trials, so that trial i of a sample_significance sample with the same seed
+    sequence reaches `threshold` at distances below the distance returned for trial i. The distance of each trial
+    is bisected in log distance within `bracket`, assuming that the significance of a trial decreases with
+    distance. Only the signal is recomputed at each step, rescaled from `result` as 1 / distance**2 with the
+    deadtime efficiency at that distance, the random offsets and normal deviates are drawn once.
+
+    Parameters
+    ----------
+    result, dt, rebin_factors, seed_sequence, start, stop
+        See _sample_trials
+    threshold : float
+        Significance threshold
+    bracket : tuple of float
+        Lower and upper distance searched in units kpc
+    rtol : float
+        Relative precision of the distances
+
+    Returns
+    -------
+    horizons : np.ndarray
+        Distance of each trial in units kpc, 0 for trials below `threshold` at the lower distance of `bracket`
+        and inf for trials above `threshold` at the upper distance
+    """
+    total, normal, _ = _draw_trials(result, dt, seed_sequence, start, stop)
+    distance = result.distance.to(u.kpc).value
+
+    def detected(idx, trial_distance):
+        scale = (distance / trial_distance) ** 2
+        xi = _trial_significance(scale.reshape(-1, 1) * total[idx], normal[idx], result.detector, dt,
+                                 rebin_factors)
+        return xi.max(axis=-1) >= threshold
+
+    idx = np.arange(stop - start)
+    lower = np.full(idx.size, float(bracket[0]))
+    upper = np.full(idx.size, float(bracket[1]))
+    below = ~detected(idx, lower)
+    above = detected(idx, upper)
+    idx = idx[~below & ~above]
+    # Trials outside of the bracket are not bisected
+    n_steps = max(0, ceil(np.log2(np.log(bracket[1] / bracket[0]) / np.log1p(rtol)))) if idx.size else 0
+    for _ in range(n_steps):
+        middle = np.sqrt(lower[idx] * upper[idx])
+        _detected = detected(idx, middle)
+        lower[idx] = np.where(_detected, middle, lower[idx])
+        upper[idx] = np.where(_detected, upper[idx], middle)
+
+    horizons = np.sqrt(lower * upper)
+    horizons[below] = 0
+    horizons[above] = np.inf
+    return horizons
+
+
+def _read_only(arr):
+    arr.flags.writeable = False
+    return arr
+
+
+def _get_model_spectra(model, t, E, mixing=None):
+    """Returns mixed neutrino spectra for all flavors from a single evaluation of a SNEWPY model
+    See Simulation._get_transformed_spectra
+    """
+    if mixing is None:
+        transformed_spectra = model.get_initial_spectra(t, E)
+    else:
+        transformed_spectra = model.get_transformed_spectra(t, E, mixing)
+    cut = (t < model.time[0]) | (model.time[-1] < t)
+    spectra = {}
+    for flavor, nu_spectrum in transformed_spectra.items():
+        nu_spectrum = nu_spectrum.reshape(t.size, E.size).to(1 / u.MeV / u.s).value
+        # TODO: Apply a fix for this once a fix has been applied to SNEWPY
+        nu_spectrum[cut] = 0
+        spectra[flavor] = nu_spectrum
+    return spectra
+
+
+def _compute_partition(model, t, E, weights, integrands, mixing=None):
+    """Integrates the photon-weighted neutrino spectra over energy for one partition of times
+
+    Parameters
+    ----------
+    model : snewpy.models.base.SupernovaModel
+        SNEWPY model used to perform calculation
+    t : astropy.quantity.Quantity
+        Array of times used to perform calculation
+    E : astropy.quantity.Quantity
+        Array of energies used to perform calculation
+    weights : dict
+        Flavor-keyed dictionary of integration weights corresponding to `E`, i.e. the photon spectrum times the
+        quadrature weights, in units m**2 MeV (but not stored with astropy units)
+    integrands : dict
+        Flavor-keyed dictionary, where each value is a list of the flavors whose neutrino spectrum is to be
+        integrated against the photon spectrum of the key flavor.
+    mixing : snewpy.flavor_transformation.FlavorTransformation or None
+        Mixing scheme used to perform calcuation, if None the initial (unmixed) spectra are used
+
+    Returns
+    -------
+    result : dict
+        Nested flavor-keyed dictionary of the integrals in units MeV / s (but not stored with astropy units)
+    """
+    spectra = _get_model_spectra(model, t, E, mixing)
+    return {flavor: {produced: spectra[produced] @ weights[flavor] for produced in produced_flavors}
+            for flavor, produced_flavors in integrands.items()}
+
+
+def _select_nodes(x, y, rtol):
+    """Returns the indices of the fewest samples needed to linearly interpolate curves to a relative tolerance
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Sorted sample positions
+    y : np.ndarray
+        Array of sampled curves with dim (curve, x)
+    rtol : float
+        Tolerance, relative to the maximum absolute value of each curve
+
+    Returns
+    -------
+    idx : np.ndarray
+        Sorted indices of the selected samples, always including the first and last
+
+    Notes
+    -----
+    Segments are split at the sample with largest interpolation error until every sample is within tolerance
+    (the Ramer-Douglas-Peucker algorithm).
+    """
+    norm = np.max(np.abs(y), axis=1, keepdims=True)
+    y = y / np.where(norm > 0, norm, 1)
+    keep = np.zeros(x.size, dtype=bool)
+    keep[[0, -1]] = True
+    segments = [(0, x.size - 1)]
+    while segments:
+        i, j = segments.pop()
+        if j - i < 2:
+            continue
+        w = (x[i + 1:j] - x[i]) / (x[j] - x[i])
+        error = np.max(np.abs(y[:, i + 1:j] - (y[:, i:i + 1] * (1 - w) + y[:, j:j + 1] * w)), axis=0)
+        k = np.argmax(error)
+        if error[k] > rtol:
+            k += i + 1
+            keep[k] = True
+            segments += [(i, k), (k, j)]
+    return np.flatnonzero(keep)
+
+
+def _integrate_rate(t, rate, edges):
+    """Integrates a rate sampled at times `t` over the bins between consecutive `edges`
+
+    The rate is interpolated with a monotone (Pchip) interpolant, which is integrated exactly. It is zero outside
+    of [t[0], t[-1]].
+
+    Parameters
+    ----------
+    t : np.ndarray
+        Sorted sample times
+    rate : np.ndarray
+        Rate sampled at times `t`
+    edges : np.ndarray
+        Sorted bin edges
+
+    Returns
+    -------
+    integral : np.ndarray
+        Integral of the rate in each bin, with size `edges.size - 1`
+    """
+    if t.size < 2:
+        return np.zeros(edges.size - 1)
+    antiderivative = PchipInterpolator(t, rate).antiderivative()
+    return np.diff(antiderivative(np.clip(edges, t[0], t[-1])))
+
+
+def _cumulative(values):
+    """Returns the cumulative sum of binned values at each bin edge, starting at 0"""
+    return np.concatenate([[0], np.cumsum(values)])
+
+
+def _rebin(E_per_V, cumulative, sim_dt, dt, offset):
+    """Rebins flavor-keyed energy deposition, see Simulation.rebin_result
+
+    Parameters
+    ----------
+    E_per_V : dict
+        Flavor-keyed energy deposition in bins of size `sim_dt`
+    cumulative : dict
+        Flavor-keyed cumulative sums of `E_per_V`, see _cumulative
+    sim_dt : float
+        Base bin size in units s
+    dt : float
+        New bin size in units s
+    offset : float
+        Offset applied to the energy deposition in units s
+
+    Returns
+    -------
+    time_binned : np.ndarray
+        Leading edges of the new bins in units s, relative to the leading edge of the first base bin
+    E_per_V_binned : dict
+        Flavor-keyed energy deposition in the new bins
+    """
+    # Bins have leading edges at i * dt, the last bin is partial if the simulation time range is not a multiple of
+    # dt. Energy deposition shifted beyond the end of the simulation time range is dropped.
+    duration = next(iter(E_per_V.values())).size * sim_dt
+    n_bins = ceil(duration / dt - 1e-9)
+    edges = np.minimum(dt * np.arange(n_bins + 1), duration)
+    positions = (edges - offset) / sim_dt  # Bin edges in units of base bins
+    E_per_V_binned = {flavor: np.diff(_cumulative_at(cumulative[flavor], E_per_V[flavor], positions))
+                      for flavor in E_per_V}
+    return dt * np.arange(n_bins), E_per_V_binned
+
+
+def _deadtime_efficiency(E_per_V_binned, dom_effvol, dt, deadtime):
+    """Returns the DOM deadtime efficiency, see Simulation._compute_deadtime_efficiency
+
+    Parameters
+    ----------
+    E_per_V_binned : np.ndarray
+        All-flavor energy deposition in MeV / m**3, in bins of size `dt`
+    dom_effvol : float or np.ndarray
+        DOM effective volume(s) in m**3 / MeV
+    dt : float
+        Bin size in units s
+    deadtime : float
+        DOM artificial deadtime in units s
+    """
+    if isinstance(dom_effvol, np.ndarray):
+        # Ensures proper np broadcasting
+        dom_signal = E_per_V_binned.reshape(-1, 1) * dom_effvol.reshape(1, -1)
+    else:
+        # In SNDAQ this is calculated **with** poisson randomness
+        dom_signal = dom_effvol * E_per_V_binned
+
+    # TODO: Adjust this scaling based on the determined "proper" method for computing deadtime
+    #   eps_dt = 0.87 / (1+ 250us * true_sn_rate) -- is true_sn_rate the rate in 500ms bins, 1s bins, etc?
+    #   SNDAQ always uses 500ms
+    # Convert scaling factor as if it is a 0.5s bin
+    scaling_factor = 0.5/dt
+    dom_signal = dom_signal * scaling_factor
+    return 0.87 / (1 + deadtime * dom_signal)
+
+
+def _cumulative_at(cumulative, values, positions):
+    """Returns the cumulative sum of binned values at fractional bin positions
+
+    Values are assumed to be uniform within each bin, so the cumulative sum is linearly interpolated between bin
+    edges. It is zero before the first bin and constant after the last.
+
+    Parameters
+    ----------
+    cumulative : np.ndarray
+        Cumulative sum of `values` at each bin edge, with size `values.size + 1` and starting at 0
+    values : np.ndarray
+        Binned values
+    positions : np.ndarray
+        Positions in units of bins, relative to the leading edge of the first bin
+
+    Returns
+    -------
+    cumulative_at : np.ndarray
+        Cumulative sum at `positions`
+    """
+    positions = np.clip(positions, 0, values.size)
+    # Positions within floating point error of a bin edge are snapped to it, so that rebinning to multiples of the
+    # bin size is exactly a sum of bins
+    edges = np.rint(positions)
+    positions = np.where(np.abs(positions - edges) < 1e-6, edges, positions)
+    idx = np.minimum(positions.astype(int), values.size - 1)
+    return cumulative[idx] + (positions - idx) * values[idx]
+
+
+def _trapz_weights(x):
+    """Returns weights w such that values @ w is the trapezoid rule integral of values sampled at x"""
+    dx = np.diff(x)
+    weights = np.zeros(x.size)
+    weights[:-1] += dx / 2
+    weights[1:] += dx / 2
+    return weights
+
+
+_memory_units = {'': 1, 'B': 1, 'KB': 10 ** 3, 'MB': 10 ** 6, 'GB': 10 ** 9, 'TB': 10 ** 12,
+                 'KIB': 2 ** 10, 'MIB': 2 ** 20, 'GIB': 2 ** 30, 'TIB': 2 ** 40}
+
+
+def _parse_memory_limit(memory_limit):
+    """Returns a memory limit in bytes, given either a number of bytes (int), a fraction of system memory (float) or
+    a string with a unit of bytes or a percentage of system memory, see Simulation.compute_energy_per_vol
+    """
+    if isinstance(memory_limit, str):
+        match = re.fullmatch(r'\s*(\d+(?:\.\d*)?(?:[eE]\d+)?)\s*([a-zA-Z]*|%)\s*', memory_limit)
+        unit = match.group(2).upper() if match else None
+        if unit == '%' and 0 < float(match.group(1)) <= 100:
+            memory_limit = float(match.group(1)) / 100
+        elif unit in _memory_units:
+            memory_limit = int(float(match.group(1)) * _memory_units[unit])
+        else:
+            raise ValueError(f"Invalid memory limit ({memory_limit!r}), expected a number of bytes with a unit (e.g. "
+                             f"'512MB', '2GiB') or a percentage of system memory (e.g. '25%').")
+
+    if isinstance(memory_limit, float) and 0 < memory_limit <= 1:
+        try:
+            total_memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+        except (AttributeError, ValueError, OSError):
+            raise ValueError('Unable to determine system memory, provide argument `memory_limit` in bytes.')
+        return int(memory_limit * total_memory)
+    elif isinstance(memory_limit, (int, float)) and not isinstance(memory_limit, bool) and memory_limit > 1:
+        return int(memory_limit)
+    raise ValueError(f'Invalid memory limit ({memory_limit}), expected a number of bytes (int) or a fraction of '
+                     f'system memory in (0, 1] (float).')
+
+
+def _measure_peak_memory(func, *args):
+    """Calls func(*args) and returns its result and the peak memory allocated during the call in bytes.
+    The peak is None if it could not be measured independently of an existing trace.
+    """
+    if tracemalloc.is_tracing():
+        if not hasattr(tracemalloc, 'reset_peak'):  # Python < 3.9
+            return func(*args), None
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        return result, peak - start
+
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+WORKER_SOURCES_SIZE = 4  # Maximum number of sources kept by each worker process, see _compute_partition_worker
+
+_worker_sources = OrderedDict()
+_worker_sources_lock = threading.Lock()
+
+
+def _compute_partition_worker(model, t, E, weights, integrands, mixing=None):
+    """Process pool entry point for _compute_partition, arguments `t` and `E` must be given in s and MeV.
+    The SNEWPY model is initialized on the first call in each worker process and kept for subsequent calls, for the
+    `WORKER_SOURCES_SIZE` most recently used models.
+    """
+    key = (model['name'], repr(sorted(model['param'].items())))
+    with _worker_sources_lock:
+        if key in _worker_sources:
+            _worker_sources.move_to_end(key)
+        else:
+            _worker_sources[key] = Source(model['name'], model['param'])
+            while len(_worker_sources) > WORKER_SOURCES_SIZE:
+                _worker_sources.popitem(last=False)
+        source = _worker_sources[key]
+    return _compute_partition(source.model, t * u.s, E * u.MeV, weights, integrands, mixing)
+
+
 def _get_partitions(*args, part_size=1000):
     if len(args) > 1:
         if not all(len(x) == len(args[0]) for x in args):
@@ -784,7 +2067,3 @@ def _get_partitions(*args, part_size=1000):
             yield tuple(x[idx:idx + part_size] for x in args) if len(args) > 1 else args[0][idx:idx + part_size]
             idx += part_size
         yield tuple(x[idx:] for x in args) if len(args) > 1 else args[0][idx:]
-
-
-
-
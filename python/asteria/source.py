@@ -25,7 +25,9 @@ from scipy.special import loggamma, gdtr
 import astropy.units as u
 import numpy as np
 import logging
+import warnings
 
+_erg_to_MeV = u.erg.to(u.MeV)
 
 
 class Source:
@@ -44,7 +46,6 @@ class Source:
         self._interp_lum = {}
         self._interp_meanE = {}
         self._interp_pinch = {}
-        self._special_compat_mode = False
         t = self.model.time
 
         if all([hasattr(self.model, attr) for attr in ("luminosity", "meanE", "pinch")]):
@@ -58,20 +59,21 @@ class Source:
 
         # TODO: change condition to see if class inherits from Fornax baseclasses
         if self.model.__class__.__name__ in ('Fornax_2019', 'Fornax_2021', 'Fornax_2022'):
-            logging.warning(f"Model '{self.model.__class__.__name__}' detected. Special compatibility mode enabled.\n"
-                            "Expect a reduction in performance and increase in simulation run times.", )
-            self._special_compat_mode = True
+            # Serve spectra for many times per call from the model's native tables, see FornaxAdapter
+            self.model = FornaxAdapter(self.model)
 
     @property
     def special_compat_mode(self):
-        """Indicates whether A special compatibility mode should be used for parsing certain SNEWPY Models
-        Currently required for (For
+        """Deprecated, always False. Fornax models previously required a special compatibility mode, they are now
+        handled by FornaxAdapter.
 
         Returns
         -------
-
+        special_compat_mode : bool
         """
-        return self._special_compat_mode
+        warnings.warn('Source.special_compat_mode is deprecated, Fornax models are handled by FornaxAdapter.',
+                      DeprecationWarning)
+        return False
 
     def luminosity(self, t, flavor=Flavor.NU_E_BAR):
         """Return interpolated source luminosity at time t for a given flavor.
@@ -89,8 +91,12 @@ class Source:
         luminosity : Astropy.units.quantity.Quantity
             Source luminosity (units of power).
         """
+        return self._luminosity(t, flavor) * (u.erg / u.s)
+
+    def _luminosity(self, t, flavor=Flavor.NU_E_BAR):
+        """Return interpolated source luminosity in units erg / s (but not stored with astropy units)"""
         if self._interp_lum:
-            return np.nan_to_num(self._interp_lum[flavor](t)) * (u.erg / u.s)
+            return np.nan_to_num(self._interp_lum[flavor](t))
         else:
             raise NotImplementedError('Source is missing `luminosity` interpolator!')
 
@@ -111,8 +117,12 @@ class Source:
             Source mean energy (units of energy).
         """
         # TODO Checks for units/unitless inputs
+        return self._meanE(t, flavor) * u.MeV
+
+    def _meanE(self, t, flavor=Flavor.NU_E_BAR):
+        """Return interpolated source mean energy in units MeV (but not stored with astropy units)"""
         if self._interp_meanE:
-            return np.nan_to_num(self._interp_meanE[flavor](t)) * u.MeV
+            return np.nan_to_num(self._interp_meanE[flavor](t))
         else:
             raise NotImplementedError('Source is missing `meanE` interpolator!')
 
@@ -149,9 +159,13 @@ class Source:
         flux :
         Source number flux (unit-less, count of neutrinos).
         """
+        return self._flux(t, flavor) / u.s
+
+    def _flux(self, t, flavor=Flavor.NU_E_BAR):
+        """Return source flux in units 1 / s (but not stored with astropy units)"""
         if self._interp_meanE and self._interp_lum:
-            L = self.luminosity(t, flavor).to(u.MeV / u.s).value
-            meanE = self.meanE(t, flavor).value
+            L = self._luminosity(t, flavor) * _erg_to_MeV
+            meanE = self._meanE(t, flavor)
 
             if isinstance(t, np.ndarray):
                 _flux = np.divide(L, meanE, where=(meanE > 0), out=np.zeros(L.size))
@@ -162,7 +176,7 @@ class Source:
                 else:
                     _flux = 0
 
-            return _flux / u.s
+            return _flux
         else:
             raise NotImplementedError('Source is missing `meanE` and.or `luminosity` interpolator!')
 
@@ -190,7 +204,7 @@ class Source:
                     'the size of `E` or use keyword argument `limit_size=False`')
         if isinstance(t, np.ndarray):
             _a = self.alpha(t, flavor)
-            _Ea = self.meanE(t, flavor).to(u.MeV).value
+            _Ea = self._meanE(t, flavor)
 
             _a[_a < 0] = 0
             # Vectorized function can lead to unregulated memory usage, better to define it only when needed
@@ -198,7 +212,155 @@ class Source:
             return _vec_energy_pdf(a=_a.reshape(1, -1), Ea=_Ea.reshape(1, -1), E=_E.reshape(-1, 1)).T
         elif isinstance(t, Number):
             _a = self.alpha(t, flavor)
-            _Ea = self.meanE(t, flavor).to(u.MeV).value
+            _Ea = self._meanE(t, flavor)
             return self._energy_pdf(_a, _Ea, E)
         else:
-            raise ValueError(f'Invalid argument types, argument `t` must be numbers or np.ndarray, Given ({type(t)})')
\ No newline at end of file
+            raise ValueError(f'Invalid argument types, argument `t` must be numbers or np.ndarray, Given ({type(t)})')
+
+
+class FornaxAdapter:
+    """Vectorized spectra for SNEWPY Fornax models (Fornax_2019, Fornax_2021, Fornax_2022)
+
+    The SNEWPY implementations of these models return spectra for one time per call (Fornax_2019), or loop over
+    times in Python (Fornax_2021/2022). This adapter reads the model's native tables of binned luminosity spectra
+    once, stores them as dense (time, energy bin) arrays, and evaluates spectra for many times at once.
+    Spectra are obtained with the same scheme as SNEWPY's 'linear' interpolation, at the model time nearest to each
+    requested time. All other attributes are forwarded to the wrapped model.
+    """
+    def __init__(self, model):
+        """
+        Parameters
+        ----------
+        model : snewpy.models.ccsn.Fornax_2019, Fornax_2021 or Fornax_2022
+            SNEWPY Fornax model
+        """
+        self.model = model
+        self.time = model.time
+        self._logE_bins = {}  # Padded log10(E / MeV) of the bin centers, dim (time, energy bin)
+        self._intercept = {}  # Binned luminosity spectrum in units 1e50 erg / (s MeV), linearly interpolated
+        self._slope = {}  # between padded bins as intercept + slope * log10(E / MeV), dim (time, energy interval)
+
+        if model.__class__.__name__ == 'Fornax_2019':
+            E, dLdE = self._read_fornax_2019(model)
+        else:
+            E = {flavor: np.asarray(model._E[flavor]) for flavor in Flavor}
+            dLdE = {flavor: np.column_stack([model._dLdE[flavor][f'g{i}'] for i in range(E[flavor].shape[1])])
+                    for flavor in Flavor}
+
+        eps = np.finfo(float).eps
+        for flavor in Flavor:
+            # Model flavors (internally) are nu_e, nu_e_bar, and nu_x, which stands for nu_mu(_bar) and
+            # nu_tau(_bar), making the flux 4x higher than nu_e and nu_e_bar.
+            factor = 1. if flavor.is_electron else 0.25
+            logE = np.log10(E[flavor])
+            dlogE = np.diff(logE, axis=1)
+            # Pad with values where the flux is fixed to zero, as is done by SNEWPY
+            self._logE_bins[flavor] = np.hstack([np.full((logE.shape[0], 1), np.log10(eps)), logE,
+                                                 logE[:, -1:] + dlogE[:, -1:]])
+            _dLdE = np.hstack([np.zeros((logE.shape[0], 1)), dLdE[flavor] * factor, np.zeros((logE.shape[0], 1))])
+            # Linear interpolant on each interval between bins, as intercept + slope * log10(E / MeV)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                slope = np.diff(_dLdE, axis=1) / np.diff(self._logE_bins[flavor], axis=1)
+            self._slope[flavor] = np.nan_to_num(slope)
+            self._intercept[flavor] = _dLdE[:, :-1] - self._slope[flavor] * self._logE_bins[flavor][:, :-1]
+
+    @staticmethod
+    def _read_fornax_2019(model):
+        """Returns the energy bin centers and direction-averaged binned spectra of a Fornax_2019 model"""
+        E = {}
+        dLdE = {}
+        if getattr(model, 'is_cached', False):
+            for flavor in Flavor:
+                factor = 1. if flavor.is_electron else 0.25  # Already applied to the cached flux
+                E[flavor] = model.E[flavor].to_value(u.MeV)
+                dLdE[flavor] = model.dLdE[flavor].to_value(model.fluxunit).mean(axis=2) / factor
+        else:
+            # Averaged over directions, only the l=0 m=0 multipole contributes. Y_00 = 1 / sqrt(4 pi)
+            for flavor in Flavor:
+                key = model._flavorkeys[flavor]
+                E[flavor] = model._h5file[key]['egroup'][()]
+                dLdE[flavor] = np.column_stack([model._h5file[key][f'g{i}']['l=0 m=0'][()]
+                                                for i in range(E[flavor].shape[1])]) / np.sqrt(4 * np.pi)
+        return E, dLdE
+
+    def __getattr__(self, name):
+        if name == 'model':  # Guards against recursion before __init__ has run, e.g. when unpickling
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def __repr__(self):
+        return repr(self.model)
+
+    def get_initial_spectra(self, t, E, flavors=Flavor):
+        """Get neutrino spectra before oscillation.
+
+        Parameters
+        ----------
+        t : astropy.Quantity
+            Time(s) to evaluate initial spectra.
+        E : astropy.Quantity
+            Energies to evaluate the initial spectra.
+        flavors: iterable of snewpy.neutrino.Flavor
+            Return spectra for these flavors only (default: all)
+
+        Returns
+        -------
+        initialspectra : dict
+            Dictionary of model spectra with dim (time, energy), keyed by neutrino flavor.
+        """
+        _t = u.Quantity(t, ndmin=1).to_value(self.time.unit)
+        _time = self.time.value
+        # Index of nearest model time, ties resolve to the earlier time (as np.argmin does). Spectra are computed
+        # once for each distinct model time.
+        idx = np.searchsorted(0.5 * (_time[1:] + _time[:-1]), _t, side='left')
+        idx, inverse = np.unique(idx, return_inverse=True)
+
+        _E = np.maximum(u.Quantity(E, ndmin=1).to_value(u.MeV), np.finfo(float).eps)
+        logE = np.log10(_E).reshape(1, -1)
+        rows = np.arange(idx.size).reshape(-1, 1)
+
+        initialspectra = {}
+        for flavor in flavors:
+            xp = self._logE_bins[flavor][idx]
+            n_bins = xp.shape[1]
+            # Bins differ between times. Offsetting each row by a multiple of the full range of log10(E) makes the
+            # bins of all times one sorted array, so the interval containing each energy is found with one search.
+            span = max(xp.max(), logE.max()) - min(xp.min(), logE.min()) + 1
+            k = np.searchsorted((xp + span * rows).ravel(), (logE + span * rows).ravel(), side='right')
+            k = k.reshape(idx.size, _E.size) - n_bins * rows - 1
+            in_bins = (k >= 0) & (k < n_bins - 1)
+            k = np.clip(k, 0, n_bins - 2)
+            dLdE = (np.take_along_axis(self._intercept[flavor][idx], k, axis=1) +
+                    np.take_along_axis(self._slope[flavor][idx], k, axis=1) * logE)
+            dLdE = np.where(in_bins, dLdE, 0)[inverse]
+            initialspectra[flavor] = (dLdE / _E * 1e50 * u.erg / u.s / u.MeV ** 2).to(1 / u.erg / u.s)
+        return initialspectra
+
+    def get_transformed_spectra(self, t, E, flavor_xform):
+        """Get neutrino spectra after applying oscillation.
+
+        Parameters
+        ----------
+        t : astropy.Quantity
+            Time(s) to evaluate initial and oscillated spectra.
+        E : astropy.Quantity
+            Energies to evaluate the initial and oscillated spectra.
+        flavor_xform : snewpy.flavor_transformation.FlavorTransformation
+            An instance from the flavor_transformation module.
+
+        Returns
+        -------
+        dict
+            Dictionary of transformed spectra with dim (time, energy), keyed by neutrino flavor.
+        """
+        initialspectra = self.get_initial_spectra(t, E)
+        return {
+            Flavor.NU_E: (flavor_xform.prob_ee(t, E) * initialspectra[Flavor.NU_E] +
+                          flavor_xform.prob_ex(t, E) * initialspectra[Flavor.NU_X]),
+            Flavor.NU_X: (flavor_xform.prob_xe(t, E) * initialspectra[Flavor.NU_E] +
+                          flavor_xform.prob_xx(t, E) * initialspectra[Flavor.NU_X]),
+            Flavor.NU_E_BAR: (flavor_xform.prob_eebar(t, E) * initialspectra[Flavor.NU_E_BAR] +
+                              flavor_xform.prob_exbar(t, E) * initialspectra[Flavor.NU_X_BAR]),
+            Flavor.NU_X_BAR: (flavor_xform.prob_xebar(t, E) * initialspectra[Flavor.NU_E_BAR] +
+                              flavor_xform.prob_xxbar(t, E) * initialspectra[Flavor.NU_X_BAR]),
+        }
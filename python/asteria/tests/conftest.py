@@ -0,0 +1,4 @@
+import os
+
+# The Simulation reads detector data relative to the ASTERIA directory
+os.environ.setdefault('ASTERIA', os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
@@ -0,0 +1,22 @@
+from asteria.photonspectra import compute_photon_spectra, get_photon_spectra
+from asteria.interactions import Interactions
+from snewpy.neutrino import Flavor
+
+import astropy.units as u
+
+import numpy as np
+
+def test_memoized_spectra(tmp_path):
+    interactions = [Interactions.InvBetaPar, Interactions.ElectronScatter]
+    E = np.arange(0, 100.1, 1) * u.MeV
+    expected = compute_photon_spectra(interactions, Flavor, E)
+
+    spectra = get_photon_spectra(interactions, Flavor, E, cache_dir=str(tmp_path))
+    for flavor in Flavor:
+        assert(np.array_equal(spectra[flavor], expected[flavor]))
+        assert(not spectra[flavor].flags.writeable)
+
+    # Spectra are shared between callers
+    shared = get_photon_spectra(interactions, Flavor, E)
+    assert(all(np.shares_memory(shared[flavor], spectra[flavor]) for flavor in Flavor))
+    assert(len(list(tmp_path.glob('photonspectra/*.npz'))) == 1)
@@ -0,0 +1,18 @@
+from asteria.quadrature import adaptive_quadrature
+
+import astropy.units as u
+
+import numpy as np
+
+def test_adaptive_quadrature():
+    # Thermal-like spectrum with a threshold at 5 MeV
+    def integrand(E):
+        return np.where(E > 5, E - 5, 0) * E ** 2 * np.exp(-E / 4)
+
+    quad = adaptive_quadrature(integrand, 0 * u.MeV, 100 * u.MeV, rtol=1e-6)
+    E = np.linspace(0, 100, 1000001)
+    expected = np.trapz(integrand(E), E)
+
+    assert(quad.error < 1e-6)
+    assert(abs(quad.integrate(integrand(quad.nodes.value)) - expected) / expected < 1e-6)
+    assert(quad.size < 1000)
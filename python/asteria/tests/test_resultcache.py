@@ -0,0 +1,61 @@
+from asteria.resultcache import ResultCache
+from asteria.simulation import Simulation
+from asteria.interactions import Interactions
+from snewpy.neutrino import Flavor
+
+import astropy.units as u
+
+import numpy as np
+import os
+
+def make_sim(**kwargs):
+    model = {'name': 'Nakazato_2013',
+             'param': {'progenitor_mass': 13*u.Msun, 'revival_time': 300*u.ms, 'metallicity': 0.02, 'eos': 'shen'}}
+    params = dict(model=model, distance=10*u.kpc, Emin=0*u.MeV, Emax=100*u.MeV, dE=1*u.MeV,
+                  tmin=-1*u.s, tmax=1*u.s, dt=2*u.ms, interactions=[Interactions.InvBetaPar])
+    params.update(kwargs)
+    return Simulation(**params)
+
+def test_load_store(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    sim = make_sim()
+    # The distance is not part of the key
+    assert(cache.key(sim) == cache.key(make_sim(distance=20*u.kpc)))
+    assert(cache.key(sim) != cache.key(make_sim(tmax=2*u.s)))
+    assert(cache.load(sim) is None)
+
+    sim.run(load_simulation=True, cache=cache)
+    assert(list(cache.manifest()) == [cache.key(sim)])
+
+    # Results are rescaled to the distance of the loading simulation
+    loaded = make_sim(distance=20*u.kpc)
+    loaded.run(load_simulation=True, cache=cache)
+    for flavor in Flavor:
+        assert(np.allclose(loaded.E_per_V[flavor], sim.E_per_V[flavor] / 4))
+
+    # Unmixed results are stored, so the mixing scheme of loaded results can be changed
+    loaded.set_mixing('AdiabaticMSW')
+    expected = make_sim(distance=20*u.kpc, mixing_scheme='AdiabaticMSW')
+    expected.run()
+    for flavor in Flavor:
+        assert(np.allclose(loaded.E_per_V[flavor], expected.E_per_V[flavor]))
+
+def test_eviction(tmp_path):
+    sims = [make_sim(tmax=tmax*u.s) for tmax in (1, 2, 3)]
+    cache = ResultCache(str(tmp_path))
+    sims[0].run(load_simulation=True, cache=cache)
+    size = cache.manifest()[cache.key(sims[0])]['size']
+    # Entry sizes are proportional to the length of the time series, the least recently used entries are evicted
+    cache.max_size = 3.5 * size
+    sims[1].run(load_simulation=True, cache=cache)
+    sims[0].run(load_simulation=True, cache=cache)
+    sims[2].run(load_simulation=True, cache=cache)
+    assert(set(cache.manifest()) == {cache.key(sims[0]), cache.key(sims[2])})
+    assert(not os.path.exists(os.path.join(str(tmp_path), cache.key(sims[1]))))
+
+    # The manifest is rebuilt from the stored entries if it is missing or corrupt
+    with open(cache.manifest_path, 'w') as f:
+        f.write('{')
+    assert(set(cache.manifest()) == {cache.key(sims[0]), cache.key(sims[2])})
+    os.remove(cache.manifest_path)
+    assert(set(cache.manifest()) == {cache.key(sims[0]), cache.key(sims[2])})
@@ -0,0 +1,264 @@
+from asteria.simulation import Simulation, _parse_memory_limit, _trial_horizons
+from asteria.horizon import detection_horizon
+from asteria.interactions import Interactions
+from asteria import photonspectra, simulation
+
+from concurrent.futures import ThreadPoolExecutor
+
+import astropy.units as u
+
+import numpy as np
+import pytest
+
+def make_sim(**kwargs):
+    model = {'name': 'Nakazato_2013',
+             'param': {'progenitor_mass': 13*u.Msun, 'revival_time': 300*u.ms, 'metallicity': 0.02, 'eos': 'shen'}}
+    params = dict(model=model, distance=10*u.kpc, Emin=0*u.MeV, Emax=100*u.MeV, dE=1*u.MeV,
+                  tmin=-1*u.s, tmax=1*u.s, dt=2*u.ms,
+                  interactions=[Interactions.InvBetaPar, Interactions.ElectronScatter])
+    params.update(kwargs)
+    return Simulation(**params)
+
+@pytest.fixture(scope='module')
+def sim():
+    sim = make_sim()
+    sim.run()
+    return sim
+
+def test_rebin_cache(sim):
+    # Rescaled results are cached at their own distance
+    sim.scale_result(10*u.kpc)
+    sim.rebin_result(2*u.ms)
+    expected = sim._total_E_per_V_binned.copy()
+
+    sim.scale_result(20*u.kpc)
+    assert(np.allclose(sim._total_E_per_V_binned, expected / 4))
+    sim.scale_result(10*u.kpc)
+    sim.rebin_result(0.5*u.s)
+    sim.rebin_result(2*u.ms)
+    assert(np.allclose(sim._total_E_per_V_binned, expected))
+
+def roll_and_sum(E_per_V, factor, shift, size):
+    # Splits each bin into `factor` equal parts, shifts them by `shift` parts and sums groups of `size` parts
+    values = np.roll(np.repeat(E_per_V / factor, factor), shift)
+    if shift > 0:
+        values[:shift] = 0
+    elif shift < 0:
+        values[shift:] = 0
+    values = np.concatenate([values, np.zeros(-values.size % size)])
+    return values.reshape(-1, size).sum(axis=1)
+
+def test_rebin_offset(sim):
+    # Rebinned results match an explicit roll-and-sum of the base bins, assuming uniform deposition within each bin
+    for dt, offset, factor, shift, size in ((10*u.ms, 10*u.ms, 1, 5, 5),  # Offset multiple of the base step
+                                            (10*u.ms, 3*u.ms, 2, 3, 10),  # Fractional offset
+                                            (3*u.ms, 0*u.ms, 2, 0, 3),  # dt not a multiple of the base step
+                                            (3*u.ms, -5*u.ms, 2, -5, 3)):
+        sim.rebin_result(dt, offset=offset)
+        expected = roll_and_sum(sim._total_E_per_V, factor, shift, size)
+        assert(np.allclose(sim._total_E_per_V_binned, expected, rtol=1e-10, atol=0))
+        assert(np.allclose(sim._time_binned, -1 + dt.to_value(u.s) * np.arange(expected.size)))
+    sim.rebin_result(2*u.ms)
+
+def test_detection_horizon(sim):
+    binnings = [0.5, 1.5] * u.s
+    horizon, lower, upper = detection_horizon(sim, 6., [0.1, 0.5, 0.9], binnings=binnings, seed=1,
+                                              min_trials=1000, max_trials=1000)
+    assert(np.all((lower <= horizon) & (horizon <= upper)))
+    # The horizons are quantiles of the distances of the trials of sample_significance
+    for probability, distance in zip([0.1, 0.5, 0.9], horizon):
+        xi = sim.sample_significance(1000, distance=distance, binnings=binnings, seed=1)
+        assert(abs((xi >= 6.).mean() - probability) < 0.01)
+
+    # Trials outside of the bracket are not bisected
+    horizons = _trial_horizons(sim.result(), 0.5, [1, 3], 6., np.random.SeedSequence(1), 0, 10, (1., 2.), 0.002)
+    assert(np.all(horizons == np.inf))
+
+    # The significance saturates at small distances because of the deadtime
+    with pytest.raises(RuntimeError):
+        detection_horizon(sim, 1e7, binnings=binnings, seed=1, min_trials=100, max_trials=100)
+
+def test_sample_significance(sim):
+    # Trials are reproducible for any number of workers and chunks
+    binnings = [0.5, 1.5] * u.s
+    xi = sim.sample_significance(200, distance=50*u.kpc, binnings=binnings, seed=1)
+    assert(np.array_equal(xi, sim.sample_significance(200, distance=50*u.kpc, binnings=binnings, seed=1,
+                                                      chunk_size=77)))
+    assert(np.array_equal(xi, sim.sample_significance(200, distance=50*u.kpc, binnings=binnings, seed=1,
+                                                      workers=3, chunk_size=50)))
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert(np.array_equal(xi, sim.sample_significance(200, distance=50*u.kpc, binnings=binnings, seed=1,
+                                                          executor=executor, chunk_size=30)))
+
+    with pytest.warns(DeprecationWarning):
+        xi = sim.sample_significance(200, distance=50*u.kpc, binnings=binnings, seeds=np.array([1, 2]))
+    assert(np.array_equal(xi, sim.sample_significance(200, distance=50*u.kpc, binnings=binnings, seed=[1, 2])))
+
+def loop_significance(sim, dt, binnings, offset, rng):
+    # Previous implementation of the trigger significance: a fresh background realization for each binning, the DOM
+    # background variance estimated from 1000 samples and a loop over the offsets of each binning
+    _, hits_i3 = sim.detector_hits(dt=dt, offset=offset, subdetector='i3', rng=rng)
+    _, hits_dc = sim.detector_hits(dt=dt, offset=offset, subdetector='dc', rng=rng)
+    detector = sim.detector
+    xi = np.zeros(binnings.size)
+    for idx_bin, binsize in enumerate(binnings):
+        rebin_factor = int(round((binsize / dt).to_value(u.one)))
+        pad = -hits_i3.size % rebin_factor
+        n_bins = (hits_i3.size + pad) // rebin_factor
+        n_bg = n_bins - 1 if pad else n_bins
+
+        def binned(values):
+            return np.concatenate([values, np.zeros(pad)]).reshape(n_bins, rebin_factor).sum(axis=1)
+
+        bg_i3 = binned(detector.i3_bg(dt=dt, size=hits_i3.size, rng=rng))
+        bg_dc = binned(detector.dc_bg(dt=dt, size=hits_i3.size, rng=rng))
+        var_i3 = rebin_factor * detector.i3_dom_bg(dt=dt, size=1000, rng=rng).var()
+        var_dc = rebin_factor * detector.dc_dom_bg(dt=dt, size=1000, rng=rng).var()
+        var_dmu = 1 / (detector.n_i3_doms / var_i3 + detector.n_dc_doms * detector.dc_rel_eff ** 2 / var_dc)
+        for idx_offset in range(rebin_factor):
+            shifted_i3, shifted_dc = np.roll(hits_i3, idx_offset), np.roll(hits_dc, idx_offset)
+            shifted_i3[:idx_offset] = 0
+            shifted_dc[:idx_offset] = 0
+            dmu = var_dmu * ((binned(shifted_i3) + bg_i3 - bg_i3[:n_bg].mean()) / var_i3 +
+                             (binned(shifted_dc) + bg_dc - bg_dc[:n_bg].mean()) / var_dc)
+            xi[idx_bin] = max(xi[idx_bin], (dmu / np.sqrt(var_dmu)).max())
+    return xi
+
+def test_significance_regression(sim):
+    # The mean and spread of the trials at fixed offsets match the previous implementation
+    dt = 0.1*u.s
+    binnings = [0.5, 1.5] * u.s
+    sample_size = 500
+    rng = np.random.default_rng(2)
+    for offset in (0, 0.25) * u.s:
+        xi = sim.sample_significance(sample_size, dt=dt, distance=50*u.kpc, offset=offset, binnings=binnings,
+                                     use_random_offset=False, only_highest=False, seed=1)
+        sim.scale_result(50*u.kpc)
+        expected = np.array([loop_significance(sim, dt, binnings, offset, rng) for _ in range(sample_size)])
+        sim.scale_result(10*u.kpc)
+
+        mean, std = xi.mean(axis=0), xi.std(axis=0)
+        assert(np.all(np.abs(mean - expected.mean(axis=0)) <
+                      4 * np.sqrt((std ** 2 + expected.std(axis=0) ** 2) / sample_size)))
+        # The sampled DOM background variance adds a relative spread of about sqrt(2 / 1000) / 2 to xi
+        assert(np.allclose(np.sqrt(std ** 2 + (mean * np.sqrt(2 / 1000) / 2) ** 2), expected.std(axis=0), rtol=0.15))
+
+def test_detection_curve(sim):
+    # The trials at each distance are those of sample_significance
+    binnings = [0.5, 1.5] * u.s
+    distances = [40, 50, 60] * u.kpc
+    probability = sim.detection_curve(distances, 6., 500, binnings=binnings, seed=1)
+    for p, distance in zip(probability, distances):
+        xi = sim.sample_significance(500, distance=distance, binnings=binnings, seed=1)
+        assert(p == (xi >= 6.).mean())
+
+def test_simulation_result(sim):
+    # Views match the rescaled and rebinned simulation
+    view = sim.result().at_distance(20*u.kpc).rebinned(0.1*u.s)
+    sim.scale_result(20*u.kpc)
+    sim.rebin_result(0.1*u.s)
+    assert(np.allclose(view.time_binned, sim.time_binned))
+    assert(np.allclose(view.total_E_per_V_binned, sim.total_E_per_V_binned))
+    assert(np.allclose(view.eps_i3, sim.eps_i3))
+    assert(np.allclose(view.eps_dc, sim.eps_dc))
+    sim.scale_result(10*u.kpc)
+    sim.rebin_result(2*u.ms)
+
+    # Binned results are read-only
+    for arr in (view.time_binned, view.total_E_per_V_binned, view.eps_i3, *view.E_per_V_binned.values()):
+        with pytest.raises(ValueError):
+            arr[0] = arr[1]
+
+def test_quadrature_memo(sim):
+    # Only the photon spectra at the nodes of the quadrature rule are memoized
+    photonspectra.clear_memo()
+    sim.compute_energy_per_vol(method='quadrature')
+    assert(len(photonspectra._memo) == 1)
+    sim.compute_energy_per_vol()
+
+def test_quadrature(sim):
+    # Method 'quadrature' matches the trapezoid rule on the energy grid of the simulation
+    sim.compute_energy_per_vol()
+    expected = sim.total_E_per_V.copy()
+    sim.compute_energy_per_vol(method='quadrature', rtol=1e-4)
+    assert(np.allclose(sim.total_E_per_V, expected, rtol=1e-4, atol=0))
+    sim.compute_energy_per_vol()
+
+def test_set_mixing():
+    # Changing the mixing of a simulation matches a simulation run with the new mixing
+    sim = make_sim()
+    sim.run()
+    for mixing_scheme, hierarchy in (('AdiabaticMSW', 'inverted'), ('AdiabaticMSW', 'normal'), (None, None)):
+        sim.set_mixing(mixing_scheme, hierarchy)
+        expected = make_sim(mixing_scheme=mixing_scheme, hierarchy=hierarchy)
+        expected.run()
+        assert(sim._E_per_V_unmixed is not None)
+        assert(all(np.allclose(sim.E_per_V[flavor], expected.E_per_V[flavor]) for flavor in sim.flavors))
+
+    # Energy-dependent mixing is recomputed with the options of the last run
+    sim.compute_energy_per_vol(method='quadrature')
+    sim.set_mixing('NeutrinoDecay')
+    expected = make_sim(mixing_scheme='NeutrinoDecay')
+    expected.compute_photon_spectra()
+    expected.compute_energy_per_vol(method='quadrature')
+    assert(sim._E_per_V_unmixed is None)
+    assert(all(np.array_equal(sim.E_per_V[flavor], expected.E_per_V[flavor]) for flavor in sim.flavors))
+
+def test_parallel_energy_per_vol(sim, monkeypatch):
+    # Partitions computed by worker processes match the serial result
+    sim.compute_energy_per_vol(part_size=200)
+    expected = sim.total_E_per_V.copy()
+    sim.compute_energy_per_vol(part_size=200, workers=2)
+    assert(np.array_equal(sim.total_E_per_V, expected))
+    sim.compute_energy_per_vol()
+
+    # Workers keep the most recently used sources
+    monkeypatch.setattr(simulation, 'WORKER_SOURCES_SIZE', 2)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for progenitor_mass in (13, 20, 50):
+            model = {'name': 'Nakazato_2013', 'param': {'progenitor_mass': progenitor_mass*u.Msun,
+                                                        'revival_time': 300*u.ms, 'metallicity': 0.02, 'eos': 'shen'}}
+            other = make_sim(model=model)
+            other.run()
+            expected = other.total_E_per_V.copy()
+            other.compute_energy_per_vol(part_size=200, executor=executor)
+            assert(np.array_equal(other.total_E_per_V, expected))
+    assert(len(simulation._worker_sources) == 2)
+    assert(list(simulation._worker_sources)[-1][1] == repr(sorted(model['param'].items())))
+
+def test_memory_limit(sim):
+    assert(_parse_memory_limit(10 ** 6) == 10 ** 6)
+    assert(_parse_memory_limit('512MB') == 512 * 10 ** 6)
+    assert(_parse_memory_limit(' 2 GiB ') == 2 * 2 ** 30)
+    assert(_parse_memory_limit('1.5e3kb') == 1.5e6)
+    assert(_parse_memory_limit('50%') == _parse_memory_limit(0.5))
+    for memory_limit in (0, -1, 1, 0., True, '0%', '150%', 'GB', '1 XB', '-1GB'):
+        with pytest.raises(ValueError):
+            _parse_memory_limit(memory_limit)
+
+    # Results are independent of the partition sizes chosen for a budget
+    sim.compute_energy_per_vol()
+    expected = sim.total_E_per_V.copy()
+    sim.compute_energy_per_vol(memory_limit='200kB')
+    assert(np.allclose(sim.total_E_per_V, expected, rtol=1e-12, atol=0))
+
+@pytest.fixture(scope='module')
+def dense_E_per_V():
+    # Energy deposition in the bins of the simulation, integrated on a 40x finer uniform grid
+    dense = make_sim(dt=0.05*u.ms)
+    dense.run()
+    return dense.total_E_per_V.value[:40000].reshape(-1, 40).sum(axis=1)
+
+def test_adaptive_time_grid(sim, dense_E_per_V):
+    sim.compute_energy_per_vol(time_grid='adaptive')
+    E_per_V = sim.total_E_per_V.value[:dense_E_per_V.size]
+    sim.compute_energy_per_vol()
+    assert(np.abs(E_per_V - dense_E_per_V).max() < 0.01 * dense_E_per_V.max())
+    assert(abs(E_per_V.sum() / dense_E_per_V.sum() - 1) < 1e-4)
+
+def test_native_time_grid(sim, dense_E_per_V):
+    sim.compute_energy_per_vol(time_grid='native')
+    E_per_V = sim.total_E_per_V.value[:dense_E_per_V.size]
+    sim.compute_energy_per_vol()
+    assert(np.abs(E_per_V - dense_E_per_V).max() < 0.02 * dense_E_per_V.max())
+    assert(abs(E_per_V.sum() / dense_E_per_V.sum() - 1) < 1e-3)
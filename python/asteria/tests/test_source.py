@@ -0,0 +1,25 @@
+from asteria.source import Source, FornaxAdapter, model_path
+from snewpy.neutrino import Flavor
+
+import astropy.units as u
+
+import numpy as np
+import os
+import pytest
+
+def test_fornax_adapter():
+    # Spectra of the adapter are those of the SNEWPY model
+    if not os.path.isfile(os.path.join(model_path, 'Fornax_2021', 'lum_spec_12M_r10000_dat.h5')):
+        pytest.skip('Fornax_2021 model data is not available')
+    source = Source('Fornax_2021', {'progenitor_mass': 12*u.Msun})
+    assert(isinstance(source.model, FornaxAdapter))
+
+    E = np.arange(0, 100.1, 0.5) * u.MeV
+    time = source.model.time
+    t = np.concatenate([time[[0, 1, time.size // 2, -1]], 0.5 * (time[1:4] + time[2:5]) + 1e-6 * u.s, [0.1, 0.3] * u.s])
+    spectra = source.model.get_initial_spectra(t, E)
+    for idx, _t in enumerate(t):
+        expected = source.model.model.get_initial_spectra(_t, E)
+        for flavor in Flavor:
+            assert(np.allclose(spectra[flavor][idx].to_value(expected[flavor].unit), expected[flavor].value.ravel(),
+                               rtol=1e-10, atol=0))
@@ -0,0 +1,57 @@
+from asteria.trigger import cumulative, window_sums, significance, max_significance, expected_significance
+
+import numpy as np
+from types import SimpleNamespace
+
+def test_window_sums():
+    # Windows of every offset, compared to shifting the values and summing partitions
+    values = np.random.default_rng(1).normal(size=(3, 23))
+    rebin_factor = 5
+    sums = window_sums(cumulative(values), rebin_factor)
+
+    assert(sums.shape == (3, rebin_factor, 5))
+    for offset in range(rebin_factor):
+        shifted = np.roll(values, offset, axis=-1)
+        shifted[:, :offset] = 0
+        expected = [shifted[:, idx:idx + rebin_factor].sum(axis=-1) for idx in range(0, 23, rebin_factor)]
+        assert(np.allclose(sums[:, offset], np.transpose(expected)))
+
+def test_max_significance():
+    # The highest significance of each binning and the window in which it is found
+    detector = SimpleNamespace(i3_dom_bg_sig=26.2, dc_dom_bg_sig=36.0, n_i3_doms=4800, n_dc_doms=360, dc_rel_eff=1.35)
+    rng = np.random.default_rng(1)
+    signal = np.zeros(250)
+    signal[245:249] = 1e4
+    hits_i3 = rng.normal(signal, np.sqrt(signal), size=(50, 250))
+    hits_dc = 0.1 * hits_i3
+    bg_i3 = rng.normal(284.9 * 0.5 * 4800, 26.2 * np.sqrt(0.5 * 4800), size=(50, 250))
+    bg_dc = rng.normal(358.9 * 0.5 * 360, 36.0 * np.sqrt(0.5 * 360), size=(50, 250))
+    rebin_factors = [1, 3, 8, 20]
+
+    xi = significance(hits_i3, hits_dc, bg_i3, bg_dc, 0.5, rebin_factors, detector)
+    xi_max, idx_max = max_significance(hits_i3, hits_dc, bg_i3, bg_dc, 0.5, rebin_factors, detector)
+
+    rows = np.arange(50)
+    for idx_bin, _xi in enumerate(xi):
+        assert(np.allclose(xi_max[:, idx_bin], _xi.max(axis=(1, 2))))
+        assert(np.array_equal(_xi[rows, idx_max[:, idx_bin, 0], idx_max[:, idx_bin, 1]], xi_max[:, idx_bin]))
+
+def test_expected_significance():
+    # The significance of the expected data matches the mean and spread of MC trials for a strong signal
+    detector = SimpleNamespace(i3_dom_bg_sig=26.2, dc_dom_bg_sig=36.0, n_i3_doms=4800, n_dc_doms=360, dc_rel_eff=1.35)
+    rng = np.random.default_rng(2)
+    signal_i3 = np.zeros(40)
+    signal_i3[20:26] = 1e4 * np.exp(-np.arange(6) / 2)
+    signal_dc = 0.1 * signal_i3
+    size = (20000, 40)
+    hits_i3 = rng.normal(signal_i3, np.sqrt(signal_i3), size=size)
+    hits_dc = rng.normal(signal_dc, np.sqrt(signal_dc), size=size)
+    bg_i3 = rng.normal(284.9 * 0.5 * 4800, 26.2 * np.sqrt(0.5 * 4800), size=size)
+    bg_dc = rng.normal(358.9 * 0.5 * 360, 36.0 * np.sqrt(0.5 * 360), size=size)
+    rebin_factors = [1, 3]
+
+    xi, _ = max_significance(hits_i3, hits_dc, bg_i3, bg_dc, 0.5, rebin_factors, detector)
+    xi_mean, xi_std, _ = expected_significance(signal_i3, signal_dc, 0.5, rebin_factors, detector)
+
+    assert(np.allclose(xi_mean, xi.mean(axis=0), rtol=0.01))
+    assert(np.allclose(xi_std, xi.std(axis=0), rtol=0.05))
@@ -0,0 +1,19 @@
+from asteria.util import atomic_path
+
+import os
+import pytest
+
+def test_atomic_path(tmp_path):
+    path = str(tmp_path / 'entry')
+    with atomic_path(path) as tmp:
+        os.makedirs(tmp)
+        open(os.path.join(tmp, 'data'), 'w').close()
+    assert(os.listdir(tmp_path) == ['entry'])
+
+    # The temporary path is removed on failure, and the entry is kept
+    with pytest.raises(RuntimeError):
+        with atomic_path(path) as tmp:
+            os.makedirs(tmp)
+            raise RuntimeError
+    assert(os.listdir(tmp_path) == ['entry'])
+    assert(os.listdir(path) == ['data'])
@@ -0,0 +1,24 @@
+from asteria.yieldtable import PhotonYieldTable
+from asteria.source import Source
+from snewpy.neutrino import Flavor
+
+import astropy.units as u
+
+import numpy as np
+
+def test_table_interpolation():
+    E = np.arange(0, 100.1, 0.5) * u.MeV
+    photon_spectra = {Flavor.NU_E_BAR: (E.value ** 2) * u.m ** 2}
+    table = PhotonYieldTable(E, photon_spectra)
+
+    alpha = np.array([0.5, 2.3, 3.7])
+    meanE = np.array([9.5, 12.1, 15.8])
+    photon_yield = table(alpha, meanE, Flavor.NU_E_BAR)
+    for a, Ea, value in zip(alpha, meanE, photon_yield):
+        pdf = np.zeros(E.size)
+        pdf[1:] = Source._energy_pdf(a, Ea, E.value[1:])
+        expected = np.trapz(pdf * E.value ** 2, E.value)
+        assert(abs(value - expected) / expected < 1e-5)
+
+    # Zero mean energy indicates no emission
+    assert(table(np.array([2.]), np.array([0.]), Flavor.NU_E_BAR)[0] == 0)
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""Vectorized SNDAQ trigger significance.
+
+The SNDAQ trigger test statistic xi (see arXiv:1108.0171) is computed from hits and background rates summed in
+search windows of several sizes, each searched at every offset in steps of the base time binning. Windows are
+computed as differences of cumulative sums, so that every trial, offset and window of a binning is evaluated in a
+few array operations. Arrays of hits and background rates have the base time binning along their last axis, any
+leading axes (e.g. trials) are broadcast.
+"""
+
+from __future__ import print_function, division
+
+from math import ceil
+
+import numpy as np
+
+
+def cumulative(values):
+    """Returns the cumulative sum of `values` at each bin edge along the last axis, starting at 0"""
+    result = np.zeros(values.shape[:-1] + (values.shape[-1] + 1,))
+    np.cumsum(values, axis=-1, out=result[..., 1:])
+    return result
+
+
+def window_sums(cumulative, rebin_factor, n_offsets=None):
+    """Returns sums in search windows of `rebin_factor` base bins, for each offset of the signal
+
+    The signal is shifted later by k base bins for offset k, so that window j of offset k spans base bins
+    [j * rebin_factor - k, (j + 1) * rebin_factor - k) of the unshifted signal. Signal shifted before the start or
+    beyond the end of the time series is dropped. The last window is partial if the time series is not a multiple of
+    `rebin_factor`.
+
+    Parameters
+    ----------
+    cumulative : np.ndarray
+        Cumulative sum of values in the base time binning along the last axis, see cumulative
+    rebin_factor : int
+        Number of base bins in a search window
+    n_offsets : int or None, optional
+        Number of offsets k = 0, ..., n_offsets - 1, if None (default) all `rebin_factor` offsets are used
+
+    Returns
+    -------
+    sums : np.ndarray
+        Window sums with shape (*cumulative.shape[:-1], n_offsets, n_bins)
+    """
+    n_offsets = rebin_factor if n_offsets is None else n_offsets
+    if not 0 < n_offsets <= rebin_factor:
+        raise ValueError(f'Number of offsets must be in [1, {rebin_factor}], given {n_offsets}')
+    size = cumulative.shape[-1] - 1
+    n_full = size // rebin_factor
+    sums = np.empty(cumulative.shape[:-1] + (n_offsets, ceil(size / rebin_factor)))
+
+    # Trailing edges of the full windows, cumulative[(j + 1) * rebin_factor - k] for offset k and window j, as a
+    # strided view of the cumulative sum. The lowest index is 1, as k < rebin_factor.
+    if n_full > 0:
+        stride = cumulative.strides[-1]
+        edges = np.lib.stride_tricks.as_strided(cumulative[..., rebin_factor:],
+                                                shape=cumulative.shape[:-1] + (n_offsets, n_full),
+                                                strides=cumulative.strides[:-1] + (-stride, rebin_factor * stride),
+                                                writeable=False)
+        sums[..., 0] = edges[..., 0]
+        np.subtract(edges[..., 1:], edges[..., :-1], out=sums[..., 1:n_full])
+    # The partial last window ends at the end of the time series, signal shifted beyond it is dropped
+    if size % rebin_factor != 0:
+        last = cumulative[..., np.maximum(size - np.arange(n_offsets), 0)]
+        sums[..., -1] = last - edges[..., -1] if n_full > 0 else last
+    return sums
+
+
+def significance(hits_i3, hits_dc, bg_i3, bg_dc, dt, rebin_factors, detector):
+    """Returns the SNDAQ trigger significance xi in every search window of each binning, for every offset
+
+    Parameters
+    ----------
+    hits_i3, hits_dc : np.ndarray
+        IC80 and DeepCore signal hits in the base time binning
+    bg_i3, bg_dc : np.ndarray
+        IC80 and DeepCore background rate in the base time binning, the background is not shifted with the signal
+    dt : float
+        Base time binning in units s
+    rebin_factors : list of int
+        Search window sizes in units of `dt`
+    detector : asteria.detector.Detector
+        Detector used to weight the subdetectors and for the DOM background rate variance
+
+    Returns
+    -------
+    xi : list of np.ndarray
+        Significances for each binning, with shape (*hits_i3.shape[:-1], rebin_factor, n_bins)
+
+    Notes
+    -----
+    The DOM background rate variance in a search window of R base bins is R * sig**2 * dt, with sig the DOM
+    background rate sigma in 1 s (see Detector.i3_dom_bg). As the variance of both subdetectors scales with R, the
+    maximum likelihood estimate of the rate deviation is a sum of the inverse-variance weighted rates of both
+    subdetectors, which is computed once for all binnings from a single cumulative sum of hits and of background.
+
+    If the time series is not a multiple of the search window, the last window is partial and excluded from the
+    background mean.
+    """
+    cumulative_hits, cumulative_bg, var_unit = _weighted_cumulatives(hits_i3, hits_dc, bg_i3, bg_dc, detector)
+    return [_window_significance(cumulative_hits, cumulative_bg, rebin_factor, dt, var_unit)
+            for rebin_factor in rebin_factors]
+
+
+def max_significance(hits_i3, hits_dc, bg_i3, bg_dc, dt, rebin_factors, detector):
+    """Returns the highest SNDAQ trigger significance xi of each binning, and the window in which it is found
+
+    Parameters
+    ----------
+    hits_i3, hits_dc, bg_i3, bg_dc, dt, rebin_factors, detector
+        See significance
+
+    Returns
+    -------
+    xi : np.ndarray
+        Highest significances with shape (*hits_i3.shape[:-1], len(rebin_factors))
+    idx_max : np.ndarray
+        Offset and bin indices (k, j) of the window of the highest significance, see window_sums, with shape
+        (*hits_i3.shape[:-1], len(rebin_factors), 2)
+
+    Notes
+    -----
+    All windows and offsets of every binning are evaluated, at a cost of O(len(rebin_factors) * size) per time
+    series.
+    """
+    shape = hits_i3.shape[:-1]
+    size = hits_i3.shape[-1]
+    cumulative_hits, cumulative_bg, var_unit = _weighted_cumulatives(*(values.reshape(-1, size) for values in
+                                                                       (hits_i3, hits_dc, bg_i3, bg_dc)), detector)
+    xi = np.zeros((cumulative_hits.shape[0], len(rebin_factors)))
+    idx_max = np.zeros((cumulative_hits.shape[0], len(rebin_factors), 2), dtype=int)
+    for idx_bin, rebin_factor in enumerate(rebin_factors):
+        _xi = _window_significance(cumulative_hits, cumulative_bg, rebin_factor, dt, var_unit)
+        _xi = _xi.reshape(_xi.shape[0], -1)
+        idx = _xi.argmax(axis=-1)
+        xi[:, idx_bin] = _xi[np.arange(idx.size), idx]
+        idx_max[:, idx_bin] = np.column_stack(np.divmod(idx, ceil(size / rebin_factor)))
+    return xi.reshape(shape + xi.shape[-1:]), idx_max.reshape(shape + idx_max.shape[-2:])
+
+
+def expected_significance(signal_i3, signal_dc, dt, rebin_factors, detector):
+    """Returns the SNDAQ trigger significance of the expected data (Asimov significance) of each binning, and its
+    standard deviation
+
+    The hits and background are replaced by their expected values, hits equal to the signal and background rates
+    equal to their mean. The expected xi of each binning is the highest xi of its windows, and the standard deviation
+    is that of xi in this window, for hits with variance equal to the signal (see Simulation.detector_hits) and the
+    Gaussian background model of the detector (see Detector.i3_bg), including the uncertainty of the background mean.
+
+    Parameters
+    ----------
+    signal_i3, signal_dc : np.ndarray
+        IC80 and DeepCore signal in the base time binning
+    dt : float
+        Base time binning in units s
+    rebin_factors : list of int
+        Search window sizes in units of `dt`
+    detector : asteria.detector.Detector
+        Detector used to weight the subdetectors and for the background model
+
+    Returns
+    -------
+    xi_mean, xi_std : np.ndarray
+        Expected significances and their standard deviations, with shape (*signal_i3.shape[:-1], len(rebin_factors))
+    idx_max : np.ndarray
+        Offset and bin indices (k, j) of the window of the expected significance, see window_sums, with shape
+        (*signal_i3.shape[:-1], len(rebin_factors), 2)
+
+    Notes
+    -----
+    The significance of the expected data approximates the mean of the highest xi of MC trials (see
+    max_significance) when the expected xi of the best window is well above that of other windows. Otherwise, e.g.
+    for signals comparable to background fluctuations or when several offsets contain the whole signal in one
+    window, the highest xi of MC trials is biased up by fluctuations in the other windows.
+    """
+    shape = signal_i3.shape[:-1]
+    size = signal_i3.shape[-1]
+    weight_i3 = 1 / detector.i3_dom_bg_sig ** 2
+    weight_dc = 1 / detector.dc_dom_bg_sig ** 2
+    var_unit = 1 / (detector.n_i3_doms * weight_i3 + detector.n_dc_doms * detector.dc_rel_eff ** 2 * weight_dc)
+    cumulative_mean = cumulative((weight_i3 * signal_i3 + weight_dc * signal_dc).reshape(-1, size))
+    cumulative_var = cumulative((weight_i3 ** 2 * signal_i3 + weight_dc ** 2 * signal_dc).reshape(-1, size))
+    # Variance of the weighted background rate in one base bin
+    var_bg = dt * (detector.n_i3_doms * weight_i3 + detector.n_dc_doms * weight_dc)
+
+    xi_mean = np.zeros((cumulative_mean.shape[0], len(rebin_factors)))
+    xi_std = np.zeros_like(xi_mean)
+    idx_max = np.zeros(xi_mean.shape + (2,), dtype=int)
+    rows = np.arange(cumulative_mean.shape[0])
+    for idx_bin, rebin_factor in enumerate(rebin_factors):
+        n_full = size // rebin_factor
+        mean = np.sqrt(var_unit / (rebin_factor * dt)) * window_sums(cumulative_mean, rebin_factor)
+        idx = mean.reshape(mean.shape[0], -1).argmax(axis=-1)
+        idx_offset, idx_time = np.divmod(idx, mean.shape[-1])
+        # Full windows are part of the background mean, the partial last window is not
+        var_bg_window = np.where(idx_time < n_full, rebin_factor * var_bg * (1 - 1 / n_full),
+                                 (size - n_full * rebin_factor) * var_bg + rebin_factor * var_bg / n_full)
+        stop = np.maximum(np.minimum((idx_time + 1) * rebin_factor, size) - idx_offset, 0)
+        var_hits_window = (cumulative_var[rows, stop] -
+                           cumulative_var[rows, np.maximum(idx_time * rebin_factor - idx_offset, 0)])
+
+        xi_mean[:, idx_bin] = mean[rows, idx_offset, idx_time]
+        xi_std[:, idx_bin] = np.sqrt(var_unit / (rebin_factor * dt) * (var_hits_window + var_bg_window))
+        idx_max[:, idx_bin, 0] = idx_offset
+        idx_max[:, idx_bin, 1] = idx_time
+    return (xi_mean.reshape(shape + xi_mean.shape[-1:]), xi_std.reshape(shape + xi_std.shape[-1:]),
+            idx_max.reshape(shape + idx_max.shape[-2:]))
+
+
+def _weighted_cumulatives(hits_i3, hits_dc, bg_i3, bg_dc, detector):
+    """Returns the cumulative sums of the inverse-variance weighted hits and background, see significance, and the
+    variance of the rate deviation in a search window of 1 s"""
+    weight_i3 = 1 / detector.i3_dom_bg_sig ** 2
+    weight_dc = 1 / detector.dc_dom_bg_sig ** 2
+    var_unit = 1 / (detector.n_i3_doms * weight_i3 + detector.n_dc_doms * detector.dc_rel_eff ** 2 * weight_dc)
+    return (cumulative(weight_i3 * hits_i3 + weight_dc * hits_dc), cumulative(weight_i3 * bg_i3 + weight_dc * bg_dc),
+            var_unit)
+
+
+def _window_significance(cumulative_hits, cumulative_bg, rebin_factor, dt, var_unit, n_offsets=None):
+    """Returns xi in every search window of one binning, for every offset, see significance and window_sums"""
+    size = cumulative_hits.shape[-1] - 1
+    bg_binned = window_sums(cumulative_bg, rebin_factor, n_offsets=1)
+    bg_mean = bg_binned[..., :size // rebin_factor].mean(axis=-1, keepdims=True)
+    # dmu = var_unit * (hits + bg - bg_mean) and xi = dmu / sqrt(var_dmu), with var_dmu = rebin_factor * dt * var_unit
+    return np.sqrt(var_unit / (rebin_factor * dt)) * (window_sums(cumulative_hits, rebin_factor, n_offsets) +
+                                                      bg_binned - bg_mean)
@@ -6,17 +6,61 @@ from astropy.units.quantity import Quantity
 from astropy.units import UnitTypeError, get_physical_type
 from astropy.config.paths import get_cache_dir
 from snewpy import get_models
+from contextlib import contextmanager
 import os
+import shutil
+import threading
 
 try:
     from snewpy import model_path
 except ImportError:
     model_path = os.path.join(get_cache_dir(), 'snewpy/models')
 
+# Local directory for ASTERIA's on-disk caches (e.g. photon yield tables)
+cache_path = os.path.join(get_cache_dir(), 'asteria')
+
 import logging
 from snewpy.models import ccsn, presn
 
 
+@contextmanager
+def atomic_path(path):
+    """Yields a temporary path, which replaces `path` once the context exits.
+
+    A file or directory is first written to the temporary path, so concurrent processes never read a partially
+    written one. Temporary paths are unique to each thread of each process, and are removed if the context exits
+    with an exception. A directory at `path` is replaced, unless another process replaces it concurrently, in which
+    case the temporary directory is discarded.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file or directory to write
+
+    Yields
+    ------
+    tmp_path : str
+        Temporary path to write to, it is not created
+    """
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        yield tmp_path
+    except BaseException:
+        if os.path.isdir(tmp_path):
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:  # Replaced concurrently by another process
+        if not os.path.isdir(tmp_path):
+            raise
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
 def init_model(model_name, download=True, download_dir=model_path, **user_param):
     """Attempts to retrieve instantiated SNEWPY model using model class name and model parameters.
     If a model name is valid, but is not found and `download`=True, this function will attempt to download the model
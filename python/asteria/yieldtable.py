@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""Photon yield lookup tables for pinched neutrino spectra.
+
+For models described by a luminosity, mean energy and pinching parameter, the energy spectrum of each flavor at any
+time is a normalized alpha-fit distribution. The photon-weighted energy integral of that distribution depends only on
+(alpha, <E>), so it may be tabulated once per energy grid and set of photon spectra, then interpolated.
+"""
+
+from __future__ import print_function, division
+
+from astropy import units as u
+from scipy.interpolate import RectBivariateSpline
+
+import numpy as np
+import hashlib
+import os
+
+from .source import Source
+from .util import atomic_path, cache_path
+
+# Default table grids of the pinching parameter and mean energy (MeV)
+ALPHA_GRID = np.linspace(-0.5, 10, 211)
+MEANE_GRID = np.geomspace(0.5, 80, 240)
+
+
+class PhotonYieldTable:
+    """Lookup table of the integral over energy of an alpha-fit spectrum times a photon spectrum
+    """
+    def __init__(self, E, photon_spectra, *, alpha=None, meanE=None, table=None):
+        """Creates a photon yield table, computing the table if one is not provided
+
+        Parameters
+        ----------
+        E : astropy.units.Quantity
+            Energy grid used to perform the integration over the neutrino spectrum.
+        photon_spectra : dict
+            Flavor-keyed dictionary of photon spectra evaluated at `E`, see Simulation.compute_photon_spectra
+        alpha : np.ndarray or None, optional
+            Grid of pinching parameter values. Default is 211 values in [-0.5, 10].
+        meanE : astropy.units.Quantity or None, optional
+            Grid of mean neutrino energies. Default is 240 log-spaced values in [0.5, 80] MeV.
+        table : dict or None, optional
+            Flavor-keyed dictionary of pre-computed tables with dim (alpha, meanE), in units m**2.
+        """
+        self.alpha = ALPHA_GRID if alpha is None else np.asarray(alpha, dtype=float)
+        self.meanE = (MEANE_GRID if meanE is None else meanE.to(u.MeV).value) * u.MeV
+        self._energy = E.to(u.MeV).value
+        self._photon_spectra = {flavor: spectrum.to(u.m ** 2).value for flavor, spectrum in photon_spectra.items()}
+
+        if table is None:
+            table = self._compute_table()
+        self._table = table
+        self._interp = {flavor: RectBivariateSpline(self.alpha, np.log(self.meanE.value), _table)
+                        for flavor, _table in self._table.items()}
+
+    @property
+    def flavors(self):
+        """Flavors for which the table has been computed"""
+        return list(self._table)
+
+    def _compute_table(self):
+        _E = self._energy.copy()
+        _E[_E == 0] = 1e-10
+        table = {flavor: np.zeros((self.alpha.size, self.meanE.size)) for flavor in self._photon_spectra}
+
+        # Partition in alpha, keeps temporary array size at meanE.size x E.size
+        for idx, a in enumerate(self.alpha):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pdf = Source._energy_pdf(a, self.meanE.value.reshape(-1, 1), _E.reshape(1, -1))
+            pdf[:, self._energy == 0] = 0  # Consistent with SNEWPY, which sets spectra to 0 at E=0
+            for flavor, photon_spectrum in self._photon_spectra.items():
+                table[flavor][idx] = np.trapz(pdf * photon_spectrum, self._energy, axis=1)
+        return table
+
+    def __call__(self, alpha, meanE, flavor):
+        """Returns the interpolated photon yield
+
+        Parameters
+        ----------
+        alpha : np.ndarray
+            Spectral pinching parameter.
+        meanE : np.ndarray
+            Mean neutrino energy in units MeV (but not stored with astropy units).
+        flavor : snewpy.neutrino.Flavor
+            Flavor of photon spectrum used to perform the calculation.
+
+        Returns
+        -------
+        photon_yield : np.ndarray
+            Integral over energy of the alpha-fit spectrum times the photon spectrum, in units m**2
+            (but not stored with astropy units). This is 0 where `meanE` is not positive.
+        """
+        alpha = np.asarray(alpha, dtype=float)
+        meanE = np.asarray(meanE, dtype=float)
+        valid = meanE > 0
+        if np.any((alpha[valid] < self.alpha[0]) | (alpha[valid] > self.alpha[-1])):
+            raise ValueError(f"Pinching parameter outside of table range [{self.alpha[0]}, {self.alpha[-1]}]")
+        if np.any((meanE[valid] < self.meanE[0].value) | (meanE[valid] > self.meanE[-1].value)):
+            raise ValueError(f"Mean energy outside of table range [{self.meanE[0]}, {self.meanE[-1]}]")
+
+        photon_yield = np.zeros(meanE.shape)
+        photon_yield[valid] = self._interp[flavor](alpha[valid], np.log(meanE[valid]), grid=False)
+        return photon_yield
+
+    def save(self, file):
+        """Saves this table to a numpy .npz file (str or file-like object)"""
+        np.savez(file, energy=self._energy, alpha=self.alpha, meanE=self.meanE.value,
+                 flavors=np.array([flavor.name for flavor in self._table]),
+                 table=np.array([self._table[flavor] for flavor in self._table]))
+
+    @classmethod
+    def load(cls, path, photon_spectra):
+        """Loads a table saved with PhotonYieldTable.save
+
+        Parameters
+        ----------
+        path : str
+            Path to .npz file
+        photon_spectra : dict
+            Flavor-keyed dictionary of photon spectra used to compute the table.
+        """
+        with np.load(path) as data:
+            flavors = {flavor.name: flavor for flavor in photon_spectra}
+            table = {flavors[name]: _table for name, _table in zip(data['flavors'], data['table'])}
+            return cls(data['energy'] * u.MeV, photon_spectra, alpha=data['alpha'], meanE=data['meanE'] * u.MeV,
+                       table=table)
+
+    @classmethod
+    def from_cache(cls, E, photon_spectra, *, alpha=None, meanE=None, cache_dir=cache_path):
+        """Returns a photon yield table from the on-disk cache, computing and storing it if it is not found
+
+        Parameters
+        ----------
+        E : astropy.units.Quantity
+            Energy grid used to perform the integration over the neutrino spectrum.
+        photon_spectra : dict
+            Flavor-keyed dictionary of photon spectra evaluated at `E`, see Simulation.compute_photon_spectra
+        alpha : np.ndarray or None, optional
+            Grid of pinching parameter values, see PhotonYieldTable
+        meanE : astropy.units.Quantity or None, optional
+            Grid of mean neutrino energies, see PhotonYieldTable
+        cache_dir : str, optional
+            Directory used to store tables. If None, the on-disk cache is not used.
+        """
+        if cache_dir is None:
+            return cls(E, photon_spectra, alpha=alpha, meanE=meanE)
+
+        _alpha = ALPHA_GRID if alpha is None else np.asarray(alpha, dtype=float)
+        _meanE = MEANE_GRID if meanE is None else meanE.to(u.MeV).value
+        _photon_spectra = {flavor: spectrum.to(u.m ** 2).value for flavor, spectrum in photon_spectra.items()}
+        path = os.path.join(cache_dir, 'yieldtable',
+                            _table_key(E.to(u.MeV).value, _photon_spectra, _alpha, _meanE) + '.npz')
+        if os.path.isfile(path):
+            return cls.load(path, photon_spectra)
+
+        table = cls(E, photon_spectra, alpha=_alpha, meanE=_meanE * u.MeV)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with atomic_path(path) as tmp_path, open(tmp_path, 'wb') as f:
+            table.save(f)
+        return table
+
+
+def _table_key(E, photon_spectra, alpha, meanE):
+    """Returns a hex digest identifying the inputs of a photon yield table"""
+    digest = hashlib.sha1()
+    for arr in (E, alpha, meanE):
+        digest.update(np.ascontiguousarray(arr, dtype=float).tobytes())
+    for flavor, spectrum in photon_spectra.items():
+        digest.update(flavor.name.encode())
+        digest.update(np.ascontiguousarray(spectrum, dtype=float).tobytes())
+    return digest.hexdigest()